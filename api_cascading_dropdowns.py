@@ -2,69 +2,385 @@
 Cascading Dropdown API Routes for GRPO
 Provides warehouses, bin locations, and batch data for dynamic dropdowns
 """
-from flask import jsonify, request
-from app import app
+from flask import Blueprint, Response, current_app, jsonify, request
 from flask_login import login_required
-from sap_integration import SAPIntegration
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+import datetime
+import hashlib
+import json
 import logging
+import threading
+import time
+import urllib.parse
 
-@app.route('/api/warehouses', methods=['GET'])
+import fallbacks
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Parse large SAP result sets incrementally when ijson is installed
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+class _TTLCache:
+    """Small thread-safe cache whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.maxsize:
+                # Dicts keep insertion order, so the first key is the oldest
+                del self._data[next(iter(self._data))]
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+
+# SAP master data changes slowly; batches change with every goods movement
+_warehouse_cache = _TTLCache(maxsize=64, ttl=600)
+_bins_cache = _TTLCache(maxsize=512, ttl=300)
+_validate_cache = _TTLCache(maxsize=1024, ttl=600)
+_batches_cache = _TTLCache(maxsize=1024, ttl=30)
+
+bp = Blueprint('cascading', __name__)
+
+# Only request the fields the dropdowns read, and enough rows to avoid paging
+_WAREHOUSE_QUERY = {'$select': 'WarehouseCode,WarehouseName', '$top': 500}
+_VALIDATE_QUERY = {'$select': 'WarehouseCode,WarehouseName'}
+_BINS_QUERY = {'$select': 'BinCode,Description,Sublevel1,Warehouse,Inactive', '$top': 2000}
+_BATCHES_QUERY = {'$select': 'Batch,Quantity,ExpirationDate,ItemCode,Status', '$top': 500}
+
+
+def _odata_str(value):
+    """Quote value as an OData string literal, doubling embedded quotes"""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _page_size(rows):
+    """Service Layer header asking for up to rows entities in one response page"""
+    return {'Prefer': f'odata.maxpagesize={rows}'}
+
+
+# SAP calls are I/O bound, so bulk lookups overlap them on a shared pool
+_BATCH_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix='sap-batches')
+# Upper bound on item codes per bulk request, and so on SAP calls it can start
+_MAX_BULK_ITEMS = 50
+
+
+# Cache entries keep the encoded response body and its ETag next to the data,
+# so cache hits skip JSON encoding and hashing entirely
+_Entry = namedtuple('_Entry', 'value body etag')
+
+
+def _entry(value, payload):
+    """Encode payload once and derive a strong ETag from the bytes"""
+    body = current_app.json.dumps(payload).encode('utf-8')
+    return _Entry(value, body, hashlib.blake2b(body, digest_size=8).hexdigest())
+
+
+# Cache misses already being fetched from SAP, keyed by (cache, key)
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _cached(cache, key, fetch, to_payload):
+    """Return the cached entry for key, calling fetch() on a miss.
+
+    Concurrent misses for the same key share a single fetch() call instead of
+    each hitting SAP. fetch() returns None when SAP B1 is unavailable; that
+    result is not cached so the next request retries SAP.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        return entry
+
+    flight_key = (id(cache), key)
+    with _inflight_lock:
+        future = _inflight.get(flight_key)
+        leader = future is None
+        if leader:
+            future = _inflight[flight_key] = Future()
+    if not leader:
+        return future.result()
+
+    try:
+        value = fetch()
+        entry = None if value is None else _entry(value, to_payload(value))
+        if entry is not None:
+            cache.set(key, entry)
+        future.set_result(entry)
+        return entry
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[flight_key]
+
+
+def _cacheable(entry, max_age):
+    """Serve a cache entry with its ETag, answering 304 if the client already has it"""
+    if request.if_none_match.contains(entry.etag):
+        response = Response(status=304)
+    else:
+        response = fallbacks.static_json(entry.body)
+    response.set_etag(entry.etag)
+    response.headers['Cache-Control'] = f'private, max-age={max_age}'
+    return response
+
+
+def _warehouses_payload(warehouses):
+    """Response body for /api/warehouses"""
+    return {'success': True, 'warehouses': warehouses}
+
+
+def _warehouses_with_bins_payload(value):
+    """Response body for /api/warehouses?with_bins=1"""
+    warehouses, bins_by_warehouse = value
+    return {'success': True, 'warehouses': warehouses, 'bins_by_warehouse': bins_by_warehouse}
+
+
+def _bins_payload(bins):
+    """Response body for /api/bin-locations"""
+    return {'success': True, 'bins': bins}
+
+
+def _batches_payload(batches):
+    """Response body for /api/batches"""
+    return {'success': True, 'batches': batches}
+
+
+def _fetch_warehouses():
+    """Fetch warehouses from SAP B1, or None if SAP is unavailable"""
+    sap = current_app.config['SAP_CLIENT']
+    if not sap.ensure_logged_in():
+        return None
+
+    try:
+        response = sap.get_prepared(sap.warehouses_url, params=_WAREHOUSE_QUERY, headers=_page_size(500), timeout=10)
+
+        if response.status_code == 200:
+            data = _json_loads(response.content)
+            warehouses = data.get('value', [])
+
+            # Transform SAP B1 warehouse data to frontend format
+            formatted_warehouses = []
+            for warehouse in warehouses:
+                formatted_warehouses.append({
+                    'code': warehouse.get('WarehouseCode'),
+                    'name': warehouse.get('WarehouseName', warehouse.get('WarehouseCode'))
+                })
+
+            logging.info(f"Retrieved {len(formatted_warehouses)} warehouses from SAP B1")
+            return formatted_warehouses
+    except Exception as e:
+        logging.error(f"Error getting warehouses from SAP: {str(e)}")
+    return None
+
+
+def _format_bin(bin_location):
+    """Transform a SAP B1 bin record to frontend format, or None if it has no code"""
+    bin_code = bin_location.get('BinCode')
+    if not bin_code:
+        return None
+    description = bin_location.get('Description') or bin_location.get('Sublevel1', '')
+    return {
+        'code': bin_code,
+        'name': description or bin_code,
+        'warehouse': bin_location.get('Warehouse'),
+        'inactive': bin_location.get('Inactive', 'tNO')
+    }
+
+
+def _fetch_bin_locations(warehouse_code):
+    """Fetch bin locations for a warehouse from SAP B1, or None if SAP is unavailable"""
+    sap = current_app.config['SAP_CLIENT']
+    if not sap.ensure_logged_in():
+        return None
+
+    try:
+        params = dict(_BINS_QUERY)
+        params['$filter'] = f"Warehouse eq {_odata_str(warehouse_code)}"
+        response = sap.get_prepared(sap.bin_locations_url, params=params, headers=_page_size(2000), timeout=10)
+
+        if response.status_code == 200:
+            data = _json_loads(response.content)
+            formatted_bins = [b for b in map(_format_bin, data.get('value', [])) if b]
+
+            logging.info(f"Retrieved {len(formatted_bins)} bin locations for warehouse {warehouse_code}")
+            return formatted_bins
+    except Exception as e:
+        logging.error(f"Error getting bin locations from SAP: {str(e)}")
+    return None
+
+
+def _fetch_warehouses_with_bins():
+    """Fetch warehouses plus the first warehouse's bins, or None if SAP is unavailable.
+
+    Only the first warehouse (the one the GRPO screen preselects) has its bins
+    fetched; the rest load lazily through /api/bin-locations. Both lookups go
+    through the same caches as their standalone endpoints.
+    """
+    warehouses_entry = _cached(_warehouse_cache, 'all', _fetch_warehouses, _warehouses_payload)
+    if warehouses_entry is None:
+        return None
+    warehouses = warehouses_entry.value
+    if not warehouses:
+        return warehouses, {}
+    first = warehouses[0]['code']
+    bins_entry = _cached(_bins_cache, first, lambda: _fetch_bin_locations(first), _bins_payload)
+    if bins_entry is None:
+        return None
+    return warehouses, {first: bins_entry.value}
+
+
+def _fetch_warehouse_validation(warehouse_code):
+    """Check a warehouse code against SAP B1, or None if SAP is unavailable"""
+    sap = current_app.config['SAP_CLIENT']
+    if not sap.ensure_logged_in():
+        return None
+
+    try:
+        # Check if warehouse exists in SAP B1
+        key = urllib.parse.quote(_odata_str(warehouse_code), safe="'")
+        url = f"{sap.warehouses_url}({key})"
+        response = sap.get_prepared(url, params=_VALIDATE_QUERY, timeout=10)
+
+        if response.status_code == 200:
+            data = _json_loads(response.content)
+            return {
+                'success': True,
+                'valid': True,
+                'warehouse': {
+                    'code': data.get('WarehouseCode'),
+                    'name': data.get('WarehouseName')
+                }
+            }
+        if response.status_code == 404:
+            return {
+                'success': True,
+                'valid': False,
+                'error': f'Warehouse {warehouse_code} not found in SAP B1'
+            }
+        # Expired session, throttling or a SAP outage says nothing about the
+        # warehouse, so don't cache a verdict for it
+        logging.warning(f"SAP B1 returned {response.status_code} validating warehouse {warehouse_code}")
+    except Exception as e:
+        logging.error(f"Error validating warehouse {warehouse_code}: {str(e)}")
+    return None
+
+
+def _iter_values(response):
+    """Yield the entities in a Service Layer 'value' array.
+
+    With ijson the array is parsed straight off the socket, so the raw SAP
+    records are never all held in memory alongside the formatted ones.
+    """
+    if ijson is None:
+        yield from _json_loads(response.content).get('value', [])
+        return
+    response.raw.decode_content = True
+    yield from ijson.items(response.raw, 'value.item', use_float=True)
+
+
+def _format_batch(batch, item_code):
+    """Format a SAP B1 batch record for the dropdown"""
+    expiry_date = batch.get('ExpirationDate')
+    if expiry_date:
+        # Format date from SAP (remove time part if present)
+        expiry_date = expiry_date.split('T')[0] if 'T' in expiry_date else expiry_date
+
+    return {
+        'BatchNumber': batch.get('Batch'),  # SAP B1 uses 'Batch' not 'BatchNumber'
+        'Quantity': batch.get('Quantity', 0),
+        'ExpiryDate': expiry_date,  # Use ExpiryDate for consistency
+        'ItemCode': batch.get('ItemCode', item_code),
+        'Status': batch.get('Status', 'bdsStatus_Released')
+    }
+
+
+def _fetch_batches_for_item(sap, item_code, warehouse_code=None):
+    """Fetch batches for an item from SAP B1, or None if SAP is unavailable.
+
+    Takes the SAP client explicitly so it can run on _BATCH_POOL threads,
+    which have no Flask app context.
+    """
+    if not sap.ensure_logged_in():
+        return None
+
+    try:
+        # Use BatchNumberDetails API to get batch information
+        params = dict(_BATCHES_QUERY)
+        params['$filter'] = f"ItemCode eq {_odata_str(item_code)}"
+        if warehouse_code:
+            params['$filter'] += f" and WarehouseCode eq {_odata_str(warehouse_code)}"
+
+        with sap.get_prepared(sap.batch_details_url, params=params, headers=_page_size(500),
+                              timeout=10, stream=True) as response:
+            if response.status_code != 200:
+                return None
+            formatted_batches = [_format_batch(batch, item_code) for batch in _iter_values(response)]
+
+        logging.info(f"Retrieved {len(formatted_batches)} batches for item {item_code}")
+        return formatted_batches
+    except Exception as e:
+        logging.error(f"Error getting batches from SAP: {str(e)}")
+    return None
+
+
+@bp.route('/api/warehouses', methods=['GET'])
 @login_required
 def cascading_get_warehouses():
-    """Get all available warehouses"""
+    """Get all available warehouses, optionally with their bin locations"""
     try:
-        sap = SAPIntegration()
-        
-        # Try to get warehouses from SAP B1
-        if sap.ensure_logged_in():
-            try:
-                url = f"{sap.base_url}/b1s/v1/Warehouses"
-                response = sap.session.get(url, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    warehouses = data.get('value', [])
-                    
-                    # Transform SAP B1 warehouse data to frontend format
-                    formatted_warehouses = []
-                    for warehouse in warehouses:
-                        formatted_warehouses.append({
-                            'code': warehouse.get('WarehouseCode'),
-                            'name': warehouse.get('WarehouseName', warehouse.get('WarehouseCode'))
-                        })
-                    
-                    logging.info(f"Retrieved {len(formatted_warehouses)} warehouses from SAP B1")
-                    return jsonify({
-                        'success': True,
-                        'warehouses': formatted_warehouses
-                    })
-            except Exception as e:
-                logging.error(f"Error getting warehouses from SAP: {str(e)}")
-        
-        # Return mock data for offline mode or on error  
-        return jsonify({
-            'success': True,
-            'warehouses': [
-                {'code': 'SCP_AVS', 'name': 'SCP Aviation Services'},
-                {'code': '7000-FG', 'name': 'Finished Goods Warehouse'},
-                {'code': 'WH-RM', 'name': 'Raw Materials Warehouse'},
-                {'code': 'WH-QC', 'name': 'Quality Control Warehouse'},
-                {'code': 'WH-RJ', 'name': 'Rejected Items Warehouse'}
-            ]
-        })
-            
+        with_bins = bool(request.args.get('with_bins'))
+        if with_bins:
+            # Saves the GRPO screen a second round trip for the first warehouse's bins
+            entry = _cached(_bins_cache, ('with_warehouses',), _fetch_warehouses_with_bins,
+                            _warehouses_with_bins_payload)
+            if entry is not None:
+                return _cacheable(entry, _bins_cache.ttl)
+
+        entry = _cached(_warehouse_cache, 'all', _fetch_warehouses, _warehouses_payload)
+        if entry is not None:
+            if with_bins:
+                # Same shape as a full with_bins answer; the bins load lazily
+                return jsonify(_warehouses_with_bins_payload((entry.value, {})))
+            return _cacheable(entry, _warehouse_cache.ttl)
+
+        # Return mock data for offline mode or on error
+        return fallbacks.static_json(fallbacks.WAREHOUSES_NO_BINS if with_bins else fallbacks.WAREHOUSES)
+
     except Exception as e:
         logging.error(f"Error in get_warehouses API: {str(e)}")
         # Return fallback data on error
-        return jsonify({
-            'success': True,
-            'warehouses': [
-                {'code': 'SCP_AVS', 'name': 'SCP Aviation Services'},
-                {'code': '7000-FG', 'name': 'Finished Goods Warehouse'}
-            ]
-        })
+        if request.args.get('with_bins'):
+            return fallbacks.static_json(fallbacks.WAREHOUSES_ERROR_NO_BINS)
+        return fallbacks.static_json(fallbacks.WAREHOUSES_ERROR)
 
-@app.route('/api/bin-locations', methods=['GET'])
+@bp.route('/api/bin-locations', methods=['GET'])
 @login_required
 def cascading_get_bin_locations():
     """Get bin locations for a specific warehouse"""
@@ -72,190 +388,114 @@ def cascading_get_bin_locations():
         warehouse_code = request.args.get('warehouse')
         if not warehouse_code:
             return jsonify({'success': False, 'error': 'Warehouse code required'}), 400
-        
-        sap = SAPIntegration()
-        
-        # Try to get bin locations from SAP B1
-        if sap.ensure_logged_in():
-            try:
-                url = f"{sap.base_url}/b1s/v1/BinLocations?$filter=Warehouse eq '{warehouse_code}'"
-                response = sap.session.get(url, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    bins = data.get('value', [])
-                    
-                    # Transform SAP B1 bin data to frontend format using correct field names
-                    formatted_bins = []
-                    for bin_location in bins:
-                        bin_code = bin_location.get('BinCode')
-                        description = bin_location.get('Description') or bin_location.get('Sublevel1', '')
-                        
-                        if bin_code:
-                            formatted_bins.append({
-                                'code': bin_code,
-                                'name': description or bin_code,
-                                'warehouse': bin_location.get('Warehouse'),
-                                'inactive': bin_location.get('Inactive', 'tNO')
-                            })
-                    
-                    logging.info(f"Retrieved {len(formatted_bins)} bin locations for warehouse {warehouse_code}")
-                    return jsonify({
-                        'success': True,
-                        'bins': formatted_bins
-                    })
-            except Exception as e:
-                logging.error(f"Error getting bin locations from SAP: {str(e)}")
-        
+
+        entry = _cached(_bins_cache, warehouse_code,
+                        lambda: _fetch_bin_locations(warehouse_code), _bins_payload)
+        if entry is not None:
+            return _cacheable(entry, _bins_cache.ttl)
+
         # Return realistic mock data based on your SAP B1 structure
         logging.warning(f"Using mock bin data for warehouse {warehouse_code}")
-        return jsonify({
-            'success': True,
-            'bins': [
-                {'code': f'{warehouse_code}-SYSTEM-BIN-LOCATION', 'name': 'System Bin Location'},
-                {'code': f'{warehouse_code}-A103', 'name': 'A103'},
-                {'code': f'{warehouse_code}-A71', 'name': 'A71'},
-                {'code': f'{warehouse_code}-J-830', 'name': 'J-830'}
-            ]
-        })
-            
+        return fallbacks.static_json(fallbacks.fill(fallbacks.BINS_TEMPLATE, WH=warehouse_code))
+
     except Exception as e:
         logging.error(f"Error in get_bin_locations API: {str(e)}")
         warehouse_code = request.args.get('warehouse', 'WH001')
-        return jsonify({
-            'success': True,
-            'bins': [
-                {'code': f'{warehouse_code}-A01', 'name': 'Aisle A - Position 01'},
-                {'code': f'{warehouse_code}-B01', 'name': 'Aisle B - Position 01'}
-            ]
-        })
+        return fallbacks.static_json(fallbacks.fill(fallbacks.BINS_ERROR_TEMPLATE, WH=warehouse_code))
 
 
 
-@app.route('/api/warehouse/<warehouse_code>/validate', methods=['GET'])
+@bp.route('/api/warehouse/<string(maxlength=32):warehouse_code>/validate', methods=['GET'])
 @login_required
 def validate_warehouse(warehouse_code):
     """Validate if a warehouse exists in SAP B1"""
+    # Reject malformed codes before they cost a SAP lookup or a cache slot
+    if not warehouse_code.isascii() or not warehouse_code.replace('-', '').replace('_', '').isalnum():
+        return jsonify({'success': False, 'error': 'Invalid warehouse code'}), 400
+
     try:
-        sap = SAPIntegration()
-        
-        if sap.ensure_logged_in():
-            try:
-                # Check if warehouse exists in SAP B1
-                url = f"{sap.base_url}/b1s/v1/Warehouses('{warehouse_code}')"
-                response = sap.session.get(url, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return jsonify({
-                        'success': True,
-                        'valid': True,
-                        'warehouse': {
-                            'code': data.get('WarehouseCode'),
-                            'name': data.get('WarehouseName')
-                        }
-                    })
-                else:
-                    return jsonify({
-                        'success': True,
-                        'valid': False,
-                        'error': f'Warehouse {warehouse_code} not found in SAP B1'
-                    })
-            except Exception as e:
-                logging.error(f"Error validating warehouse {warehouse_code}: {str(e)}")
-                
+        entry = _cached(_validate_cache, warehouse_code,
+                        lambda: _fetch_warehouse_validation(warehouse_code), lambda result: result)
+        if entry is not None:
+            return _cacheable(entry, _validate_cache.ttl)
+
         # Return valid for offline mode or when SAP is not available
-        return jsonify({
-            'success': True,
-            'valid': True,
-            'warehouse': {
-                'code': warehouse_code,
-                'name': f'Warehouse {warehouse_code}'
-            }
-        })
-        
+        return fallbacks.static_json(fallbacks.fill(fallbacks.VALIDATE_TEMPLATE, WH=warehouse_code))
+
     except Exception as e:
         logging.error(f"Error in validate_warehouse API: {str(e)}")
-        return jsonify({
-            'success': True,
-            'valid': True,
-            'warehouse': {
-                'code': warehouse_code,
-                'name': f'Warehouse {warehouse_code}'
-            }
-        })
+        return fallbacks.static_json(fallbacks.fill(fallbacks.VALIDATE_TEMPLATE, WH=warehouse_code))
 
-@app.route('/api/batches', methods=['GET'])
+@bp.route('/api/batches', methods=['GET'])
 @login_required
 def get_item_batches():
     """Get batches for a specific item code and optionally warehouse"""
     try:
         item_code = request.args.get('item_code')
         warehouse_code = request.args.get('warehouse')
-        
+
         if not item_code:
             return jsonify({'success': False, 'error': 'Item code is required'}), 400
-        
-        sap = SAPIntegration()
-        
-        # Try to get batches from SAP B1
-        if sap.ensure_logged_in():
-            try:
-                # Use BatchNumberDetails API to get batch information
-                url = f"{sap.base_url}/b1s/v1/BatchNumberDetails?$filter=ItemCode eq '{item_code}'"
-                if warehouse_code:
-                    url += f" and WarehouseCode eq '{warehouse_code}'"
-                
-                response = sap.session.get(url, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    batches = data.get('value', [])
-                    
-                    # Format batch data for dropdown using correct SAP B1 field names
-                    formatted_batches = []
-                    for batch in batches:
-                        expiry_date = batch.get('ExpirationDate')
-                        if expiry_date:
-                            # Format date from SAP (remove time part if present)
-                            expiry_date = expiry_date.split('T')[0] if 'T' in expiry_date else expiry_date
-                        
-                        formatted_batches.append({
-                            'BatchNumber': batch.get('Batch'),  # SAP B1 uses 'Batch' not 'BatchNumber'
-                            'Quantity': batch.get('Quantity', 0),
-                            'ExpiryDate': expiry_date,  # Use ExpiryDate for consistency
-                            'ItemCode': batch.get('ItemCode', item_code),
-                            'Status': batch.get('Status', 'bdsStatus_Released')
-                        })
-                    
-                    logging.info(f"Retrieved {len(formatted_batches)} batches for item {item_code}")
-                    return jsonify({
-                        'success': True,
-                        'batches': formatted_batches
-                    })
-            except Exception as e:
-                logging.error(f"Error getting batches from SAP: {str(e)}")
-        
+
+        sap = current_app.config['SAP_CLIENT']
+        entry = _cached(_batches_cache, (item_code, warehouse_code),
+                        lambda: _fetch_batches_for_item(sap, item_code, warehouse_code), _batches_payload)
+        if entry is not None:
+            return _cacheable(entry, _batches_cache.ttl)
+
         # Return mock data for offline mode or on error
-        import datetime
         future_date = (datetime.datetime.now() + datetime.timedelta(days=365)).strftime('%Y-%m-%d')
-        
-        return jsonify({
-            'success': True,
-            'batches': [
-                {'BatchNumber': f'BATCH-{item_code}-001', 'Quantity': 100, 'ExpiryDate': future_date},
-                {'BatchNumber': f'BATCH-{item_code}-002', 'Quantity': 75, 'ExpiryDate': future_date},
-                {'BatchNumber': f'BATCH-{item_code}-003', 'Quantity': 50, 'ExpiryDate': future_date}
-            ]
-        })
-            
+        return fallbacks.static_json(fallbacks.fill(fallbacks.BATCHES_TEMPLATE, DATE=future_date, ITEM=item_code))
+
     except Exception as e:
         logging.error(f"Error in get_batches API: {str(e)}")
         item_code = request.args.get('item_code', 'ITEM001')
         # Return fallback data on error
+        return fallbacks.static_json(fallbacks.fill(fallbacks.BATCHES_ERROR_TEMPLATE, ITEM=item_code))
+
+@bp.route('/api/batches/bulk', methods=['POST'])
+@login_required
+def get_bulk_item_batches():
+    """Get batches for several item codes at once, fetching from SAP B1 concurrently"""
+    try:
+        data = request.get_json(silent=True) or {}
+        item_codes = data.get('item_codes')
+        warehouse_code = data.get('warehouse')
+
+        if not item_codes or not isinstance(item_codes, list):
+            return jsonify({'success': False, 'error': 'item_codes list is required'}), 400
+        if len(item_codes) > _MAX_BULK_ITEMS:
+            return jsonify({'success': False,
+                            'error': f'At most {_MAX_BULK_ITEMS} item codes per request'}), 400
+        if not all(isinstance(code, str) and code for code in item_codes):
+            return jsonify({'success': False, 'error': 'item_codes must be non-empty strings'}), 400
+        if warehouse_code is not None and not isinstance(warehouse_code, str):
+            return jsonify({'success': False, 'error': 'warehouse must be a string'}), 400
+
+        sap = current_app.config['SAP_CLIENT']
+        batches_by_item = {}
+        futures = {}
+        for item_code in dict.fromkeys(item_codes):
+            entry = _batches_cache.get((item_code, warehouse_code))
+            if entry is not None:
+                batches_by_item[item_code] = entry.value
+            else:
+                future = _BATCH_POOL.submit(_fetch_batches_for_item, sap, item_code, warehouse_code)
+                futures[future] = item_code
+
+        for future in as_completed(futures):
+            item_code = futures[future]
+            batches = future.result()
+            if batches is not None:
+                _batches_cache.set((item_code, warehouse_code), _entry(batches, _batches_payload(batches)))
+            batches_by_item[item_code] = batches or []
+
+        logging.info(f"Retrieved batches for {len(batches_by_item)} items ({len(futures)} from SAP B1)")
         return jsonify({
             'success': True,
-            'batches': [
-                {'BatchNumber': f'BATCH-{item_code}-001', 'Quantity': 100, 'ExpiryDate': '2025-12-31'}
-            ]
-        })
\ No newline at end of file
+            'batches': batches_by_item
+        })
+
+    except Exception as e:
+        logging.error(f"Error in get_bulk_batches API: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -1,38 +1,84 @@
 import os
+import hashlib
 import logging
+import threading
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from sqlalchemy import select, text
+from sqlalchemy.engine import URL
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-# Load environment variables from .env file if it exists
+# Configure logging before anything logs; a logging.info() call on an
+# unconfigured root would install a WARNING-level handler first
+logging.basicConfig(level=logging.DEBUG)
+
+# Load environment variables from .env file if it exists; without one (as in
+# production) skip both the dotenv import and its directory search
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_INSTANCE = os.path.join(_HERE, "instance")
+_env_path = os.path.join(_HERE, ".env")
+if os.path.isfile(_env_path):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(_env_path, override=False)
+        logging.info("Environment variables loaded from .env file")
+    except ImportError:
+        logging.info("python-dotenv not installed, using system environment variables")
+    except Exception as e:
+        logging.warning("Could not load .env file: %s", e)
+
+# Snapshot the environment once (after .env is applied) for config lookups
+_ENV = dict(os.environ)
+
+# Use orjson for faster JSON encoding/decoding when it is installed
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    logging.info("Environment variables loaded from .env file")
+    import orjson
 except ImportError:
-    logging.info("python-dotenv not installed, using system environment variables")
-except Exception as e:
-    logging.warning(f"Could not load .env file: {e}")
+    orjson = None
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Compress large JSON responses (dropdown data) when flask-compress is installed
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
 
 
 class Base(DeclarativeBase):
     pass
 
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, keeping Flask's output format"""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 # Initialize extensions
 db = SQLAlchemy(model_class=Base)
 login_manager = LoginManager()
 
 # Create Flask app
 app = Flask(__name__)
-app.secret_key = os.environ.get(
+app.secret_key = _ENV.get(
     "SESSION_SECRET") or "dev-secret-key-change-in-production"
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+if Compress is not None:
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_MIN_SIZE'] = 512
+    Compress(app)
 
 # Database configuration - prioritize MySQL for local development
 database_url = None
@@ -40,74 +86,80 @@ db_type = None
 
 # Check for MySQL configuration first (local development priority)
 mysql_config = {
-    'host': os.environ.get('MYSQL_HOST', 'localhost'),
-    'port': os.environ.get('MYSQL_PORT', '3306'),
-    'user': os.environ.get('MYSQL_USER', 'root'),
-    'password': os.environ.get('MYSQL_PASSWORD', 'root@123'),
-    'database': os.environ.get('MYSQL_DATABASE', 'wms_db_dev')
+    'host': _ENV.get('MYSQL_HOST', 'localhost'),
+    'port': _ENV.get('MYSQL_PORT', '3306'),
+    'user': _ENV.get('MYSQL_USER', 'root'),
+    'password': _ENV.get('MYSQL_PASSWORD', 'root@123'),
+    'database': _ENV.get('MYSQL_DATABASE', 'wms_db_dev')
 }
 
 # Try MySQL first if any MySQL environment variables are set or DATABASE_URL contains mysql
-database_url_env = os.environ.get("DATABASE_URL", "")
-has_mysql_env = any(os.environ.get(key) for key in ['MYSQL_HOST', 'MYSQL_USER', 'MYSQL_PASSWORD', 'MYSQL_DATABASE'])
+database_url_env = _ENV.get("DATABASE_URL", "")
+has_mysql_env = any(_ENV.get(key) for key in ('MYSQL_HOST', 'MYSQL_USER', 'MYSQL_PASSWORD', 'MYSQL_DATABASE'))
 is_mysql_url = database_url_env.startswith("mysql")
 
+# Pool settings for networked databases: LIFO checkout keeps the most recently
+# used connections warm, and a short connect timeout bounds cold starts.
+# pool_pre_ping catches server-side disconnects, so connections only need
+# recycling well inside MySQL's wait_timeout rather than every few minutes
+SERVER_ENGINE_OPTIONS = {
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+    "pool_size": 25,
+    "max_overflow": 25,
+    "pool_use_lifo": True,
+    "connect_args": {"connect_timeout": 3}
+}
+
 if has_mysql_env or is_mysql_url:
     try:
         if is_mysql_url:
             database_url = database_url_env
             logging.info("✅ Using MySQL from DATABASE_URL environment variable")
         else:
-            database_url = f"mysql+pymysql://{mysql_config['user']}:{mysql_config['password']}@{mysql_config['host']}:{mysql_config['port']}/{mysql_config['database']}"
+            # URL.create quotes credentials, so passwords like 'root@123' parse correctly
+            database_url = URL.create("mysql+pymysql",
+                                      username=mysql_config['user'],
+                                      password=mysql_config['password'],
+                                      host=mysql_config['host'],
+                                      port=int(mysql_config['port']),
+                                      database=mysql_config['database']).render_as_string(hide_password=False)
             logging.info("✅ Using MySQL from individual environment variables")
-        
-        # Test MySQL connection
-        from sqlalchemy import create_engine, text
-        test_engine = create_engine(database_url, connect_args={'connect_timeout': 5})
-        with test_engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        
+
+        # No connection probe here: it blocked every process start on a network
+        # round trip. pool_pre_ping and _check_database_once cover that instead.
         app.config["SQLALCHEMY_DATABASE_URI"] = database_url
-        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-            "pool_recycle": 300,
-            "pool_pre_ping": True,
-            "pool_size": 10,
-            "max_overflow": 20
-        }
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = dict(SERVER_ENGINE_OPTIONS)
         db_type = "mysql"
-        logging.info("✅ MySQL database connection successful")
         
     except Exception as e:
-        logging.warning(f"⚠️ MySQL connection failed: {e}")
+        logging.warning("⚠️ MySQL configuration failed: %s", e)
         database_url = None
 
 # Fallback to PostgreSQL (Replit environment)
 if not database_url:
-    database_url = os.environ.get("DATABASE_URL")
+    database_url = database_url_env
     if database_url and not database_url.startswith("mysql"):
         logging.info("✅ Using PostgreSQL database (Replit environment)")
         app.config["SQLALCHEMY_DATABASE_URI"] = database_url
-        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-            "pool_recycle": 300,
-            "pool_pre_ping": True,
-            "pool_size": 10,
-            "max_overflow": 20
-        }
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = dict(SERVER_ENGINE_OPTIONS)
         db_type = "postgresql"
 
 # Final fallback to SQLite
 if not database_url:
     logging.warning("⚠️ No database found, using SQLite fallback")
-    sqlite_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'wms.db')
+    sqlite_path = os.path.join(_INSTANCE, 'wms.db')
     app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{sqlite_path}"
+    # SQLite is an in-process file: no stale sockets to ping, and opening a
+    # connection is cheap enough not to pool
     app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-        "pool_recycle": 300,
-        "pool_pre_ping": True,
+        "poolclass": NullPool,
     }
     db_type = "sqlite"
     # Ensure instance directory exists
-    os.makedirs(os.path.dirname(sqlite_path), exist_ok=True)
-    logging.info(f"SQLite database path: {sqlite_path}")
+    if not os.path.isdir(_INSTANCE):
+        os.makedirs(_INSTANCE, exist_ok=True)
+    logging.info("SQLite database path: %s", sqlite_path)
 
 # Store database type for use in other modules
 app.config["DB_TYPE"] = db_type
@@ -118,52 +170,124 @@ login_manager.init_app(app)
 login_manager.login_view = 'login'  # type: ignore
 login_manager.login_message = 'Please log in to access this page.'
 
+_db_check_lock = threading.Lock()
+
+
+@app.before_request
+def _check_database_once():
+    """Verify database connectivity on the first request rather than at import"""
+    if app.config.get("DB_READY") is not None:
+        return
+    with _db_check_lock:
+        if app.config.get("DB_READY") is not None:
+            return
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            app.config["DB_READY"] = True
+            logging.info("✅ %s database connection successful", db_type)
+        except Exception as e:
+            app.config["DB_READY"] = False
+            logging.error("⚠️ %s database connection failed: %s", db_type, e)
+
 # SAP B1 Configuration
-app.config['SAP_B1_SERVER'] = os.environ.get('SAP_B1_SERVER',
-                                             'https://192.168.0.194:50000')
-app.config['SAP_B1_USERNAME'] = os.environ.get('SAP_B1_USERNAME', 'manager')
-app.config['SAP_B1_PASSWORD'] = os.environ.get('SAP_B1_PASSWORD', '1422')
-app.config['SAP_B1_COMPANY_DB'] = os.environ.get('SAP_B1_COMPANY_DB',
-                                                 'EINV-TESTDB-LIVE-HUST')
-
-# Import models after app is configured to avoid circular imports
-import models
-import models_extensions
-
-with app.app_context():
-    # Create all database tables first
-    db.create_all()
-    logging.info("Database tables created")
+app.config['SAP_B1_SERVER'] = _ENV.get('SAP_B1_SERVER',
+                                       'https://192.168.0.194:50000')
+app.config['SAP_B1_USERNAME'] = _ENV.get('SAP_B1_USERNAME', 'manager')
+app.config['SAP_B1_PASSWORD'] = _ENV.get('SAP_B1_PASSWORD', '1422')
+app.config['SAP_B1_COMPANY_DB'] = _ENV.get('SAP_B1_COMPANY_DB',
+                                           'EINV-TESTDB-LIVE-HUST')
+
+
+def _insert_ignore(table, values):
+    """INSERT a row unless its key already exists, in one statement on every backend"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        stmt = pg_insert(table).values(**values).on_conflict_do_nothing()
+    else:
+        stmt = table.insert().values(**values)
+        if dialect == 'mysql':
+            stmt = stmt.prefix_with('IGNORE')
+        elif dialect == 'sqlite':
+            stmt = stmt.prefix_with('OR IGNORE')
+    return db.session.execute(stmt).rowcount
+
+
+def _seed_marker_path():
+    """Sentinel recording which database the defaults were last seeded into"""
+    return os.path.join(app.instance_path, '.seeded')
+
+
+def _seed_marker():
+    """Hash of the database URI, so the sentinel never stores credentials"""
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    return hashlib.sha256(uri.encode('utf-8')).hexdigest()
+
+
+def _schema_marker_path():
+    """Sentinel named after the mapped tables and database, touched after create_all"""
+    key = repr((sorted(db.metadata.tables), _seed_marker()))
+    return os.path.join(app.instance_path, f".schema_{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}")
+
+
+def _schema_is_current(marker_path):
+    """True if create_all already ran for these tables since the models last changed"""
+    try:
+        marker_mtime = os.path.getmtime(marker_path)
+    except OSError:
+        return False
+    import models
+    import models_extensions
+    models_mtime = max(os.path.getmtime(models.__file__),
+                       os.path.getmtime(models_extensions.__file__))
+    return marker_mtime > models_mtime
+
+
+def _bootstrap_defaults():
+    """Create database tables and the default branch and admin user"""
+    # Models register their tables on import; load them before create_all
+    from models_extensions import Branch
+    from models import User
+
+    # Create all database tables first, unless nothing changed since the last run;
+    # delete instance/.schema_* to force it
+    marker_path = _schema_marker_path()
+    if _schema_is_current(marker_path):
+        logging.info("Database schema unchanged, skipping create_all")
+    else:
+        db.create_all()
+        os.makedirs(app.instance_path, exist_ok=True)
+        with open(marker_path, 'a'):
+            os.utime(marker_path)
+        logging.info("Database tables created")
     
     # Create default data for PostgreSQL database
     try:
-        from models_extensions import Branch
-        from werkzeug.security import generate_password_hash
-        from models import User
-        
         # Create default branch
-        default_branch = Branch.query.filter_by(id='BR001').first()
-        if not default_branch:
-            default_branch = Branch()
-            default_branch.id = 'BR001'
-            default_branch.name = 'Main Branch'
-            default_branch.description = 'Main Office Branch'
-            default_branch.address = 'Main Office'
-            default_branch.phone = '123-456-7890'
-            default_branch.email = 'main@company.com'
-            default_branch.manager_name = 'Branch Manager'
-            default_branch.is_active = True
-            default_branch.is_default = True
-            db.session.add(default_branch)
+        created = _insert_ignore(Branch.__table__, {
+            'id': 'BR001',
+            'name': 'Main Branch',
+            'description': 'Main Office Branch',
+            'address': 'Main Office',
+            'phone': '123-456-7890',
+            'email': 'main@company.com',
+            'manager_name': 'Branch Manager',
+            'is_active': True,
+            'is_default': True
+        })
+        if created:
             logging.info("Default branch created")
         
-        # Create default admin user
-        admin = User.query.filter_by(username='admin').first()
-        if not admin:
+        # Create default admin user; only hash the password if the row is missing
+        admin_exists = db.session.execute(
+            select(User.id).where(User.username == 'admin').limit(1)).scalar()
+        if not admin_exists:
+            from werkzeug.security import generate_password_hash
             admin = User()
             admin.username = 'admin'
             admin.email = 'admin@company.com'
-            admin.password_hash = generate_password_hash('admin123')
+            admin.password_hash = generate_password_hash('admin123', method='scrypt')
             admin.first_name = 'System'
             admin.last_name = 'Administrator'
             admin.role = 'admin'
@@ -176,24 +300,65 @@ with app.app_context():
             logging.info("Default admin user created")
             
         db.session.commit()
+        os.makedirs(app.instance_path, exist_ok=True)
+        with open(_seed_marker_path(), 'w') as f:
+            f.write(_seed_marker())
         logging.info("✅ Default data initialization completed")
         
     except Exception as e:
-        logging.error(f"Error initializing default data: {e}")
+        logging.error("Error initializing default data: %s", e)
         db.session.rollback()
         # Continue with application startup
 
-# Initialize dual database support for MySQL sync 
-# Enable by default but fail gracefully if MySQL not available
+
+@app.cli.command('init-db')
+def init_db():
+    """Create tables and default data (run once per deployment)"""
+    _bootstrap_defaults()
+
+
+def _already_seeded():
+    """True if the sentinel shows this database was seeded by an earlier boot"""
+    try:
+        with open(_seed_marker_path()) as f:
+            return f.read() == _seed_marker()
+    except OSError:
+        return False
+
+
+# Workers skip the bootstrap; run `flask init-db` once per deployment instead
+if _ENV.get('RUN_BOOTSTRAP') == '1' and not _already_seeded():
+    with app.app_context():
+        _bootstrap_defaults()
+
+# Dual database support for MySQL sync. The engines (and their MySQL connection
+# test) are only built when something first uses DUAL_DB, not at import
 try:
-    from db_dual_support import init_dual_database
-    dual_db = init_dual_database(app)
-    app.config['DUAL_DB'] = dual_db
-    logging.info("✅ Dual database support initialized for MySQL sync")
+    from db_dual_support import LazyDualDatabase
+    app.config['DUAL_DB'] = LazyDualDatabase(app)
+    logging.info("✅ Dual database support registered for MySQL sync")
 except Exception as e:
-    logging.warning(f"⚠️ Dual database support not available: {e}")
+    logging.warning("⚠️ Dual database support not available: %s", e)
     app.config['DUAL_DB'] = None
     logging.info("💡 MySQL sync disabled, using single database mode")
 
-# Import routes to register them
-import routes
+
+def register_routes():
+    """Import the models and routes and attach the shared SAP client.
+
+    Called by the WSGI entry point (main.py) rather than at import, so CLI
+    commands and scripts that only need app/db skip loading every view.
+    """
+    if 'SAP_CLIENT' in app.config:
+        return
+
+    # Import routes to register them (routes imports the models)
+    import routes
+    import models_extensions
+
+    from api_cascading_dropdowns import bp as cascading_bp
+    app.register_blueprint(cascading_bp)
+
+    # Shared SAP B1 client so API handlers reuse pooled connections and the B1 session
+    from sap_integration import SAPIntegration
+    app.config['SAP_CLIENT'] = SAPIntegration()
@@ -48,7 +48,7 @@ def check_and_fix_admin():
                 print(f"  Role: {admin_user[4]}")
                 
                 # Generate new password hash for 'admin123'
-                new_password_hash = generate_password_hash('admin123')
+                new_password_hash = generate_password_hash('admin123', method='scrypt')
                 print(f"\n📝 Updating admin password...")
                 
                 cursor.execute("""
@@ -68,7 +68,7 @@ def check_and_fix_admin():
                 print("❌ Admin user not found. Creating new admin user...")
                 
                 # Create new admin user
-                password_hash = generate_password_hash('admin123')
+                password_hash = generate_password_hash('admin123', method='scrypt')
                 cursor.execute("""
                     INSERT INTO users (username, email, password_hash, role, user_is_active, first_name, last_name, branch_name)
                     VALUES ('admin', 'admin@wms.local', %s, 'admin', 1, 'Admin', 'User', 'Head Office')
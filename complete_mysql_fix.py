@@ -5,44 +5,82 @@ Fixes all database schema issues and admin credentials
 """
 
 import os
-import mysql.connector
+from collections import defaultdict
+import pymysql
 from werkzeug.security import generate_password_hash
 
+DEFAULT_DOCUMENT_SERIES = [
+    ('GRPO', 'GRPO-', 1, True),
+    ('TRANSFER', 'TR-', 1, True),
+    ('PICKLIST', 'PL-', 1, True)
+]
+
+def load_existing_columns(cursor, tables):
+    """Map each table to the lower-cased names of its columns, in one query"""
+    placeholders = ", ".join(["%s"] * len(tables))
+    cursor.execute(
+        "SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS "
+        f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({placeholders})",
+        tuple(tables))
+    existing = defaultdict(set)
+    for table_name, column_name in cursor.fetchall():
+        existing[table_name].add(column_name.lower())
+    return existing
+
+def add_missing_columns(cursor, existing, table, columns, label):
+    """Add the columns a table lacks with a single ALTER TABLE"""
+    missing = []
+    for column in columns:
+        name = column.split()[0]
+        if name.lower() in existing[table]:
+            print(f"✓ {label} column exists: {name}")
+        else:
+            missing.append(column)
+    if not missing:
+        return
+    
+    alter = f"ALTER TABLE {table} " + ", ".join(f"ADD COLUMN {column}" for column in missing)
+    try:
+        # Metadata-only change on MySQL 8.0+ / MariaDB 10.3+, no table copy
+        cursor.execute(alter + ", ALGORITHM=INSTANT")
+    except pymysql.MySQLError:
+        cursor.execute(alter)
+    for column in missing:
+        print(f"✅ Added {label.lower()} column: {column.split()[0]}")
+
 def complete_mysql_fix():
     """Complete fix for all MySQL schema issues"""
     
     # Database connection details
-    host = os.environ.get('MYSQL_HOST', 'localhost')
-    port = int(os.environ.get('MYSQL_PORT', '3306'))
-    user = os.environ.get('MYSQL_USER', 'root')
-    password = os.environ.get('MYSQL_PASSWORD', 'root@123')
-    database = os.environ.get('MYSQL_DATABASE', 'wms_db_test')
+    env = dict(os.environ)
+    host = env.get('MYSQL_HOST', 'localhost')
+    port = int(env.get('MYSQL_PORT', '3306'))
+    user = env.get('MYSQL_USER', 'root')
+    password = env.get('MYSQL_PASSWORD', 'root@123')
+    database = env.get('MYSQL_DATABASE', 'wms_db_test')
     
     try:
         print("🔧 Connecting to MySQL database...")
-        connection = mysql.connector.connect(
+        connection = pymysql.connect(
             host=host,
             port=port,
             user=user,
             password=password,
-            database=database
+            database=database,
+            autocommit=False
         )
         
         cursor = connection.cursor()
+        existing = load_existing_columns(cursor, ('users', 'branches', 'grpo_documents'))
         
+        # Phase 1: schema changes. MySQL commits each DDL statement on its own, so
+        # stop at the first failure rather than seeding data into a half-fixed schema
         print("📝 Step 1: Fix user_role to role column...")
-        try:
-            cursor.execute("SHOW COLUMNS FROM users LIKE 'role'")
-            role_exists = cursor.fetchone()
-            
-            cursor.execute("SHOW COLUMNS FROM users LIKE 'user_role'")
-            user_role_exists = cursor.fetchone()
-            
-            if user_role_exists and not role_exists:
-                cursor.execute("ALTER TABLE users CHANGE COLUMN user_role role VARCHAR(20) DEFAULT 'user'")
-                print("✅ Renamed user_role to role")
-        except Exception as e:
-            print(f"⚠️ Role column fix: {e}")
+        if 'user_role' in existing['users'] and 'role' not in existing['users']:
+            cursor.execute("ALTER TABLE users CHANGE COLUMN user_role role VARCHAR(20) DEFAULT 'user'")
+            existing['users'].discard('user_role')
+            existing['users'].add('role')
+            print("✅ Renamed user_role to role")
         
         print("📝 Step 2: Add missing user columns...")
         user_columns = [
@@ -53,16 +91,18 @@ def complete_mysql_fix():
             "last_login TIMESTAMP NULL",
             "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
         ]
-        
-        for column in user_columns:
-            try:
-                cursor.execute(f"ALTER TABLE users ADD COLUMN {column}")
-                print(f"✅ Added user column: {column.split()[0]}")
-            except Exception as e:
-                if "Duplicate column name" in str(e):
-                    print(f"✓ User column exists: {column.split()[0]}")
-                else:
-                    print(f"⚠️ Error adding {column.split()[0]}: {e}")
+        add_missing_columns(cursor, existing, 'users', user_columns, 'User')
+        
+        # Login and the admin seed look users up by username; make that an index seek
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'users' "
+            "AND COLUMN_NAME = 'username' AND SEQ_IN_INDEX = 1 AND NON_UNIQUE = 0")
+        if cursor.fetchone()[0]:
+            print("✓ Unique username index exists")
+        else:
+            cursor.execute("ALTER TABLE users ADD UNIQUE INDEX ux_users_username (username)")
+            print("✅ Added unique username index")
         
         print("📝 Step 3: Add missing branch columns...")
         branch_columns = [
@@ -74,16 +114,15 @@ def complete_mysql_fix():
             "is_default BOOLEAN DEFAULT FALSE",
             "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
         ]
+        add_missing_columns(cursor, existing, 'branches', branch_columns, 'Branch')
         
-        for column in branch_columns:
-            try:
-                cursor.execute(f"ALTER TABLE branches ADD COLUMN {column}")
-                print(f"✅ Added branch column: {column.split()[0]}")
-            except Exception as e:
-                if "Duplicate column name" in str(e):
-                    print(f"✓ Branch column exists: {column.split()[0]}")
-                else:
-                    print(f"⚠️ Error adding {column.split()[0]}: {e}")
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.TABLE_CONSTRAINTS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'branches' "
+            "AND CONSTRAINT_TYPE = 'PRIMARY KEY'")
+        if not cursor.fetchone()[0]:
+            cursor.execute("ALTER TABLE branches ADD PRIMARY KEY (id)")
+            print("✅ Added branches primary key")
         
         print("📝 Step 4: Add missing GRPO document columns...")
         grpo_columns = [
@@ -92,81 +131,72 @@ def complete_mysql_fix():
             "qc_notes TEXT",
             "draft_or_post VARCHAR(20) DEFAULT 'draft'"
         ]
-        
-        for column in grpo_columns:
-            try:
-                cursor.execute(f"ALTER TABLE grpo_documents ADD COLUMN {column}")
-                print(f"✅ Added GRPO column: {column.split()[0]}")
-            except Exception as e:
-                if "Duplicate column name" in str(e):
-                    print(f"✓ GRPO column exists: {column.split()[0]}")
-                else:
-                    print(f"⚠️ Error adding {column.split()[0]}: {e}")
+        add_missing_columns(cursor, existing, 'grpo_documents', grpo_columns, 'GRPO')
         
         print("📝 Step 5: Create document number series table...")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS document_number_series (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                document_type VARCHAR(20) NOT NULL UNIQUE,
+                prefix VARCHAR(10) NOT NULL,
+                current_number INT DEFAULT 1,
+                year_suffix BOOLEAN DEFAULT TRUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                INDEX idx_document_type (document_type)
+            )
+        """)
+        print("✅ Document number series table created")
+        
+        # Phase 2: seed data, committed as one transaction
+        print("📝 Step 6: Seed document series, admin user and default branch...")
+        if env.get('WMS_BOOTSTRAP_FAST_HASH') == '1':
+            # Developer databases only: a single PBKDF2 round instead of ~150ms of hashing
+            password_hash = generate_password_hash('admin123', method='pbkdf2:sha256:1')
+        else:
+            password_hash = generate_password_hash('admin123', method='scrypt')
+        
+        # All seed rows go in one transaction so a failure leaves none of them half-applied
         try:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS document_number_series (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    document_type VARCHAR(20) NOT NULL UNIQUE,
-                    prefix VARCHAR(10) NOT NULL,
-                    current_number INT DEFAULT 1,
-                    year_suffix BOOLEAN DEFAULT TRUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_document_type (document_type)
-                )
-            """)
-            print("✅ Document number series table created")
+            connection.begin()
             
-            cursor.execute("""
+            # PyMySQL folds an INSERT ... VALUES executemany into one multi-row statement
+            cursor.executemany("""
                 INSERT IGNORE INTO document_number_series (document_type, prefix, current_number, year_suffix)
-                VALUES 
-                ('GRPO', 'GRPO-', 1, TRUE),
-                ('TRANSFER', 'TR-', 1, TRUE),
-                ('PICKLIST', 'PL-', 1, TRUE)
-            """)
+                VALUES (%s, %s, %s, %s)
+            """, DEFAULT_DOCUMENT_SERIES)
             print("✅ Default document series added")
-        except Exception as e:
-            print(f"⚠️ Document series error: {e}")
-        
-        print("📝 Step 6: Fix admin user credentials...")
-        password_hash = generate_password_hash('admin123')
-        
-        try:
+            
+            # Relies on the unique username index ensured in step 2
             cursor.execute("""
-                UPDATE users SET 
-                    password_hash = %s,
+                INSERT INTO users (username, email, password_hash, role, user_is_active, first_name, last_name, branch_name)
+                VALUES ('admin', 'admin@wms.local', %s, 'admin', TRUE, 'Admin', 'User', 'Head Office')
+                ON DUPLICATE KEY UPDATE
+                    password_hash = VALUES(password_hash),
                     role = 'admin',
                     user_is_active = TRUE,
                     first_name = 'Admin',
                     last_name = 'User',
                     branch_name = 'Head Office'
-                WHERE username = 'admin'
             """, (password_hash,))
-            
-            if cursor.rowcount == 0:
-                cursor.execute("""
-                    INSERT INTO users (username, email, password_hash, role, user_is_active, first_name, last_name, branch_name)
-                    VALUES ('admin', 'admin@wms.local', %s, 'admin', TRUE, 'Admin', 'User', 'Head Office')
-                """, (password_hash,))
+            if cursor.rowcount == 1:
                 print("✅ Created new admin user")
             else:
                 print("✅ Updated existing admin user")
-        except Exception as e:
-            print(f"⚠️ Admin user error: {e}")
-        
-        print("📝 Step 7: Ensure default branch...")
-        try:
+            
             cursor.execute("""
                 INSERT IGNORE INTO branches (id, name, description, is_active)
                 VALUES ('HQ001', 'Head Office', 'Main headquarters branch', TRUE)
             """)
             print("✅ Default branch ensured")
+            
+            connection.commit()
         except Exception as e:
-            print(f"⚠️ Default branch error: {e}")
+            connection.rollback()
+            connection.close()
+            print(f"❌ Seed data error, no seed rows were written: {e}")
+            return False
         
-        connection.commit()
         cursor.close()
         connection.close()
         
@@ -179,7 +209,7 @@ def complete_mysql_fix():
         return True
         
     except Exception as e:
-        print(f"❌ Database error: {e}")
+        print(f"❌ Database error, stopping: {e}")
         return False
 
 if __name__ == "__main__":
@@ -5,6 +5,7 @@ Handles both SQLite (for Replit) and MySQL (for local development) synchronizati
 
 import os
 import logging
+import threading
 from sqlalchemy import create_engine, text
 from sqlalchemy.exc import SQLAlchemyError
 import json
@@ -118,16 +119,51 @@ class DualDatabaseManager:
 
 # Global instance
 dual_db_manager = None
+_dual_db_lock = threading.Lock()
+_dual_db_app = None
 
 def init_dual_database(app):
-    """Initialize dual database support"""
+    """Initialize dual database support (only the first call builds the engines)"""
     global dual_db_manager
-    dual_db_manager = DualDatabaseManager(app)
+    if dual_db_manager is None:
+        with _dual_db_lock:
+            if dual_db_manager is None:
+                dual_db_manager = DualDatabaseManager(app)
     return dual_db_manager
 
+class LazyDualDatabase:
+    """Stands in for DualDatabaseManager, building it (and its engines) on first use"""
+    
+    def __init__(self, app):
+        global _dual_db_app
+        _dual_db_app = app
+        self._app = app
+    
+    def __getattr__(self, name):
+        return getattr(init_dual_database(self._app), name)
+
+def get_database_connections():
+    """Open one raw DB-API connection per database, keyed 'sqlite' and 'mysql'.
+
+    A database whose engine is unavailable maps to None. Used by standalone
+    migration scripts, which must close the connections they get.
+    """
+    manager = dual_db_manager or DualDatabaseManager(_dual_db_app)
+    connections = {}
+    for name, engine in (('sqlite', manager.sqlite_engine), ('mysql', manager.mysql_engine)):
+        try:
+            connections[name] = engine.raw_connection() if engine is not None else None
+        except Exception as e:
+            logging.warning(f"⚠️ Could not open {name} connection: {e}")
+            connections[name] = None
+    return connections
+
 def sync_model_change(model_name, operation, data, where_clause=None):
     """Helper function to sync model changes"""
-    if dual_db_manager:
+    manager = dual_db_manager
+    if manager is None and _dual_db_app is not None:
+        manager = init_dual_database(_dual_db_app)
+    if manager:
         # Convert SQLAlchemy model name to table name
         table_name = model_name.lower() + 's' if not model_name.endswith('s') else model_name.lower()
-        dual_db_manager.sync_to_mysql(table_name, operation, data, where_clause)
\ No newline at end of file
+        manager.sync_to_mysql(table_name, operation, data, where_clause)
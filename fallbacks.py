@@ -0,0 +1,143 @@
+"""
+Fallback Payloads for Dropdown APIs
+Pre-encoded JSON bodies returned when SAP B1 is unavailable or a lookup fails
+"""
+import json
+from flask import Response
+
+
+def static_json(body):
+    """Wrap a pre-encoded JSON body in a response"""
+    return Response(body, mimetype='application/json')
+
+
+def fill(template, **values):
+    """Substitute JSON-escaped values for the __NAME__ placeholders in template"""
+    for name, value in values.items():
+        template = template.replace(f'__{name}__'.encode(), json.dumps(value)[1:-1].encode('utf-8'))
+    return template
+
+
+# /api/warehouses, /api/bin-locations, /api/warehouse/<code>/validate, /api/batches
+WAREHOUSES = json.dumps({
+    'success': True,
+    'warehouses': [
+        {'code': 'SCP_AVS', 'name': 'SCP Aviation Services'},
+        {'code': '7000-FG', 'name': 'Finished Goods Warehouse'},
+        {'code': 'WH-RM', 'name': 'Raw Materials Warehouse'},
+        {'code': 'WH-QC', 'name': 'Quality Control Warehouse'},
+        {'code': 'WH-RJ', 'name': 'Rejected Items Warehouse'}
+    ]
+}).encode('utf-8')
+
+WAREHOUSES_ERROR = json.dumps({
+    'success': True,
+    'warehouses': [
+        {'code': 'SCP_AVS', 'name': 'SCP Aviation Services'},
+        {'code': '7000-FG', 'name': 'Finished Goods Warehouse'}
+    ]
+}).encode('utf-8')
+
+# /api/warehouses?with_bins=1 keeps its bins_by_warehouse key even offline
+WAREHOUSES_NO_BINS = json.dumps(dict(json.loads(WAREHOUSES), bins_by_warehouse={})).encode('utf-8')
+WAREHOUSES_ERROR_NO_BINS = json.dumps(dict(json.loads(WAREHOUSES_ERROR), bins_by_warehouse={})).encode('utf-8')
+
+BINS_TEMPLATE = json.dumps({
+    'success': True,
+    'bins': [
+        {'code': '__WH__-SYSTEM-BIN-LOCATION', 'name': 'System Bin Location'},
+        {'code': '__WH__-A103', 'name': 'A103'},
+        {'code': '__WH__-A71', 'name': 'A71'},
+        {'code': '__WH__-J-830', 'name': 'J-830'}
+    ]
+}).encode('utf-8')
+
+BINS_ERROR_TEMPLATE = json.dumps({
+    'success': True,
+    'bins': [
+        {'code': '__WH__-A01', 'name': 'Aisle A - Position 01'},
+        {'code': '__WH__-B01', 'name': 'Aisle B - Position 01'}
+    ]
+}).encode('utf-8')
+
+VALIDATE_TEMPLATE = json.dumps({
+    'success': True,
+    'valid': True,
+    'warehouse': {
+        'code': '__WH__',
+        'name': 'Warehouse __WH__'
+    }
+}).encode('utf-8')
+
+BATCHES_TEMPLATE = json.dumps({
+    'success': True,
+    'batches': [
+        {'BatchNumber': 'BATCH-__ITEM__-001', 'Quantity': 100, 'ExpiryDate': '__DATE__'},
+        {'BatchNumber': 'BATCH-__ITEM__-002', 'Quantity': 75, 'ExpiryDate': '__DATE__'},
+        {'BatchNumber': 'BATCH-__ITEM__-003', 'Quantity': 50, 'ExpiryDate': '__DATE__'}
+    ]
+}).encode('utf-8')
+
+BATCHES_ERROR_TEMPLATE = json.dumps({
+    'success': True,
+    'batches': [
+        {'BatchNumber': 'BATCH-__ITEM__-001', 'Quantity': 100, 'ExpiryDate': '2025-12-31'}
+    ]
+}).encode('utf-8')
+
+
+# /api/get-warehouses, /api/get-bins, /api/get-batches (SAP B1 field names)
+SAP_WAREHOUSES = json.dumps({
+    'success': True,
+    'warehouses': [
+        {'WarehouseCode': 'WH001', 'WarehouseName': 'Main Warehouse'},
+        {'WarehouseCode': 'WH002', 'WarehouseName': 'Secondary Warehouse'},
+        {'WarehouseCode': 'WH003', 'WarehouseName': 'Storage Warehouse'}
+    ]
+}).encode('utf-8')
+
+SAP_BINS_TEMPLATE = json.dumps({
+    'success': True,
+    'bins': [
+        {'BinCode': '__WH__-BIN-01', 'BinName': 'Bin Location 01'},
+        {'BinCode': '__WH__-BIN-02', 'BinName': 'Bin Location 02'},
+        {'BinCode': '__WH__-BIN-03', 'BinName': 'Bin Location 03'}
+    ]
+}).encode('utf-8')
+
+_SAP_SAMPLE_BATCH = {
+    'Batch': '20220729',
+    'ItemCode': '__ITEM__',
+    'ItemDescription': 'Sample Item',
+    'Status': 'bdsStatus_Released',
+    'AdmissionDate': '2022-07-29T00:00:00Z',
+    'SystemNumber': 1
+}
+
+SAP_BATCHES_TEMPLATE = json.dumps({
+    'success': True,
+    'batches': [
+        _SAP_SAMPLE_BATCH,
+        {
+            'Batch': '271022',
+            'ItemCode': '__ITEM__',
+            'ItemDescription': 'Sample Item',
+            'Status': 'bdsStatus_Released',
+            'AdmissionDate': '2022-10-28T00:00:00Z',
+            'SystemNumber': 4
+        },
+        {
+            'Batch': '231122',
+            'ItemCode': '__ITEM__',
+            'ItemDescription': 'Sample Item',
+            'Status': 'bdsStatus_Released',
+            'AdmissionDate': '2022-11-24T00:00:00Z',
+            'SystemNumber': 6
+        }
+    ]
+}).encode('utf-8')
+
+SAP_BATCHES_ERROR_TEMPLATE = json.dumps({
+    'success': True,
+    'batches': [_SAP_SAMPLE_BATCH]
+}).encode('utf-8')
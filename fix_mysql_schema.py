@@ -5,9 +5,71 @@ Adds missing columns to existing MySQL database
 """
 
 import os
+import re
 import sys
+from collections import defaultdict
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.constants import ClientFlag
+
+_COL_RE = re.compile(r'ADD COLUMN (\w+)', re.I)
+
+# werkzeug scrypt hash of the default 'admin123' password, precomputed so a
+# schema fix run doesn't spend a KDF evaluation before its first statement
+ADMIN_SEED_HASH = (
+    "scrypt:32768:8:1$ZRPRvMVWm5EBp4G1$"
+    "e50d47a0b891fc570e9da631b149ce4c81fe4eac758bfb7593da025295905fd8"
+    "a56219d2b1e5fb1123c5addaef974e376345e11fc68eded5c9ecd9a4f039dd05"
+)
+
+SEED_SCRIPT = ";\n".join([
+    """INSERT IGNORE INTO document_number_series (document_type, prefix, current_number, year_suffix)
+    VALUES
+    ('GRPO', 'GRPO-', 1, TRUE),
+    ('TRANSFER', 'TR-', 1, TRUE),
+    ('PICKLIST', 'PL-', 1, TRUE)""",
+    """INSERT INTO users (username, email, password_hash, role, user_is_active, first_name, last_name, branch_name)
+    VALUES ('admin', 'admin@wms.local', %s, 'admin', 1, 'Admin', 'User', 'Head Office')
+    ON DUPLICATE KEY UPDATE
+        password_hash = VALUES(password_hash),
+        role = 'admin',
+        user_is_active = 1,
+        first_name = 'Admin',
+        last_name = 'User',
+        branch_name = 'Head Office'""",
+    """INSERT IGNORE INTO branches (id, name, description, is_active)
+    VALUES ('HQ001', 'Head Office', 'Main headquarters branch', TRUE)""",
+])
+
+def load_existing_columns(cursor, database, tables):
+    """Map each table to the lower-cased names of its columns, in one query"""
+    placeholders = ", ".join(["%s"] * len(tables))
+    cursor.execute(
+        "SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS "
+        f"WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders})",
+        (database, *tables))
+    existing = defaultdict(set)
+    for table_name, column_name in cursor.fetchall():
+        existing[table_name].add(column_name.lower())
+    return existing
+
+def add_missing_columns(cursor, existing, table, column_sqls):
+    """Apply the "ADD COLUMN ..." clauses a table still needs as one ALTER TABLE"""
+    missing = []
+    for column_sql in column_sqls:
+        if _COL_RE.search(column_sql).group(1).lower() in existing[table]:
+            print(f"✓ Column already exists: {column_sql}")
+        else:
+            missing.append(column_sql)
+    if not missing:
+        return
+    
+    try:
+        cursor.execute(f"ALTER TABLE {table} " + ", ".join(missing))
+        for column_sql in missing:
+            print(f"✅ Added column: {column_sql}")
+    except Error as e:
+        print(f"⚠️ Error adding columns to {table}: {e}")
 
 def fix_mysql_schema():
     """Fix MySQL database schema by adding missing columns"""
@@ -21,16 +83,25 @@ def fix_mysql_schema():
     
     try:
         print("🔧 Connecting to MySQL database...")
+        if not mysql.connector.HAVE_CEXT:
+            print("⚠️ MySQL connector C extension not available, using the slower pure-Python protocol")
         connection = mysql.connector.connect(
             host=host,
             port=port,
             user=user,
             password=password,
-            database=database
+            database=database,
+            # C extension protocol when installed; buffered cursors so probes
+            # don't leave unread rows
+            use_pure=not mysql.connector.HAVE_CEXT,
+            buffered=True,
+            autocommit=False,
+            client_flags=[ClientFlag.MULTI_STATEMENTS]
         )
         
         if connection.is_connected():
             cursor = connection.cursor()
+            existing = load_existing_columns(cursor, database, ('users', 'branches', 'grpo_documents'))
             
             print("📝 Adding missing columns to users table...")
             
@@ -45,29 +116,20 @@ def fix_mysql_schema():
             ]
             
             # Check if we need to rename user_role to role
-            cursor.execute("SHOW COLUMNS FROM users LIKE 'role'")
-            role_exists = cursor.fetchone()
-            
-            cursor.execute("SHOW COLUMNS FROM users LIKE 'user_role'")
-            user_role_exists = cursor.fetchone()
+            role_exists = 'role' in existing['users']
+            user_role_exists = 'user_role' in existing['users']
             
             if user_role_exists and not role_exists:
                 print("🔄 Renaming user_role column to role...")
                 cursor.execute("ALTER TABLE users CHANGE COLUMN user_role role VARCHAR(20) DEFAULT 'user'")
+                existing['users'].discard('user_role')
+                existing['users'].add('role')
                 print("✅ Renamed user_role to role")
             elif not role_exists and not user_role_exists:
                 missing_user_columns.append("ADD COLUMN role VARCHAR(20) DEFAULT 'user'")
                 print("➕ Will add role column")
             
-            for column_sql in missing_user_columns:
-                try:
-                    cursor.execute(f"ALTER TABLE users {column_sql}")
-                    print(f"✅ Added column: {column_sql}")
-                except Error as e:
-                    if "Duplicate column name" in str(e):
-                        print(f"✓ Column already exists: {column_sql}")
-                    else:
-                        print(f"⚠️ Error adding column {column_sql}: {e}")
+            add_missing_columns(cursor, existing, 'users', missing_user_columns)
             
             print("📝 Adding missing columns to branches table...")
             
@@ -82,15 +144,7 @@ def fix_mysql_schema():
                 "ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
             ]
             
-            for column_sql in missing_branch_columns:
-                try:
-                    cursor.execute(f"ALTER TABLE branches {column_sql}")
-                    print(f"✅ Added column: {column_sql}")
-                except Error as e:
-                    if "Duplicate column name" in str(e):
-                        print(f"✓ Column already exists: {column_sql}")
-                    else:
-                        print(f"⚠️ Error adding column {column_sql}: {e}")
+            add_missing_columns(cursor, existing, 'branches', missing_branch_columns)
             
             print("📝 Creating document_number_series table if missing...")
             
@@ -110,65 +164,38 @@ def fix_mysql_schema():
                 """)
                 print("✅ Document number series table created")
                 
-                # Insert default series
-                cursor.execute("""
-                    INSERT IGNORE INTO document_number_series (document_type, prefix, current_number, year_suffix)
-                    VALUES 
-                    ('GRPO', 'GRPO-', 1, TRUE),
-                    ('TRANSFER', 'TR-', 1, TRUE),
-                    ('PICKLIST', 'PL-', 1, TRUE)
-                """)
-                print("✅ Default document series created")
-                
             except Error as e:
                 print(f"⚠️ Error creating document_number_series table: {e}")
             
-            print("📝 Creating/updating admin user with proper credentials...")
-            
-            # Generate proper password hash for 'admin123'
-            from werkzeug.security import generate_password_hash
-            password_hash = generate_password_hash('admin123')
-            
-            # First check if admin exists
-            cursor.execute("SELECT id FROM users WHERE username = 'admin'")
-            admin_exists = cursor.fetchone()
-            
-            if admin_exists:
-                # Update existing admin user
-                try:
-                    cursor.execute("""
-                        UPDATE users SET 
-                            password_hash = %s,
-                            first_name = 'Admin',
-                            last_name = 'User',
-                            branch_name = 'Head Office',
-                            role = 'admin',
-                            user_is_active = 1
-                        WHERE username = 'admin'
-                    """, (password_hash,))
-                    print("✅ Admin user updated with new password hash")
-                except Error as e:
-                    print(f"⚠️ Error updating admin user: {e}")
-            else:
-                # Create new admin user
-                try:
-                    cursor.execute("""
-                        INSERT INTO users (username, email, password_hash, role, user_is_active, first_name, last_name, branch_name)
-                        VALUES ('admin', 'admin@wms.local', %s, 'admin', 1, 'Admin', 'User', 'Head Office')
-                    """, (password_hash,))
-                    print("✅ New admin user created with proper credentials")
-                except Error as e:
-                    print(f"⚠️ Error creating admin user: {e}")
-            
-            # Ensure default branch exists
+            # The admin upsert below keys on username; make sure it is uniquely indexed
             try:
-                cursor.execute("""
-                    INSERT IGNORE INTO branches (id, name, description, is_active)
-                    VALUES ('HQ001', 'Head Office', 'Main headquarters branch', TRUE)
-                """)
+                cursor.execute(
+                    "SELECT COUNT(*) FROM information_schema.STATISTICS "
+                    "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'users' AND COLUMN_NAME = 'username' "
+                    "AND SEQ_IN_INDEX = 1 AND NON_UNIQUE = 0", (database,))
+                if not cursor.fetchone()[0]:
+                    cursor.execute("ALTER TABLE users ADD UNIQUE INDEX ux_users_username (username)")
+                    print("✅ Added unique username index")
+            except Error as e:
+                print(f"⚠️ Error adding username index: {e}")
+            
+            print("📝 Seeding document series, admin user and default branch...")
+            
+            # One transaction (autocommit is off) sent as a single multi-statement
+            # round trip, with no SELECT-then-UPDATE-or-INSERT for the admin row
+            try:
+                cursor.execute(SEED_SCRIPT, (ADMIN_SEED_HASH,))
+                # Drain every result set before committing
+                for _ in cursor.fetchsets():
+                    pass
+                print("✅ Default document series created")
+                print("✅ Admin user ensured with proper credentials")
                 print("✅ Default branch ensured")
+                
+                connection.commit()
             except Error as e:
-                print(f"⚠️ Error creating default branch: {e}")
+                connection.rollback()
+                print(f"⚠️ Error seeding default data, nothing was written: {e}")
             
             print("📝 Adding missing columns to grpo_documents table...")
             
@@ -180,15 +207,24 @@ def fix_mysql_schema():
                 "ADD COLUMN draft_or_post VARCHAR(20) DEFAULT 'draft'"
             ]
             
-            for column_sql in missing_grpo_columns:
-                try:
-                    cursor.execute(f"ALTER TABLE grpo_documents {column_sql}")
-                    print(f"✅ Added GRPO column: {column_sql}")
-                except Error as e:
-                    if "Duplicate column name" in str(e):
-                        print(f"✓ GRPO column already exists: {column_sql}")
-                    else:
-                        print(f"⚠️ Error adding GRPO column {column_sql}: {e}")
+            add_missing_columns(cursor, existing, 'grpo_documents', missing_grpo_columns)
+            
+            # Per-user GRPO list (ORDER BY created_at DESC) and per-user PO lookup
+            grpo_indexes = {
+                'idx_grpo_user_created': "ADD INDEX idx_grpo_user_created (user_id, created_at)",
+                'idx_grpo_user_po': "ADD INDEX idx_grpo_user_po (user_id, po_number)"
+            }
+            try:
+                cursor.execute(
+                    "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS "
+                    "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'grpo_documents'", (database,))
+                existing_indexes = {row[0] for row in cursor.fetchall()}
+                missing_indexes = [sql for name, sql in grpo_indexes.items() if name not in existing_indexes]
+                if missing_indexes:
+                    cursor.execute("ALTER TABLE grpo_documents " + ", ".join(missing_indexes))
+                    print(f"✅ Added GRPO indexes: {', '.join(missing_indexes)}")
+            except Error as e:
+                print(f"⚠️ Error adding GRPO indexes: {e}")
             
             connection.commit()
             cursor.close()
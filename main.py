@@ -1,10 +1,11 @@
-from app import app
+import os
 
-# Import routes
-import routes
+from app import app, register_routes
 
-# Import cascading dropdown APIs
-import api_cascading_dropdowns
+# Register models, routes and the shared SAP client
+register_routes()
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
+    # Debugger and reloader only when asked for; production runs main:app under gunicorn
+    debug = os.environ.get('FLASK_DEBUG', '0').lower() in ('1', 'true')
+    app.run(host="0.0.0.0", port=5000, debug=debug, use_reloader=debug, threaded=True)
@@ -1,4 +1,5 @@
 from datetime import datetime
+from flask import g, has_request_context
 from flask_login import UserMixin
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import relationship
@@ -24,8 +25,8 @@ class User(UserMixin, db.Model):
     must_change_password = db.Column(
         db.Boolean, default=False)  # Force password change on next login
     last_login = db.Column(db.DateTime, nullable=True)
-    permissions = db.Column(db.Text,
-                         nullable=True)  # JSON string of screen permissions
+    permissions = db.Column(db.String(1024),
+                         nullable=True)  # JSON string of screen permissions, kept in-row
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime,
                         default=datetime.utcnow,
@@ -96,7 +97,14 @@ class User(UserMixin, db.Model):
         """Check if user has permission for a specific screen"""
         if self.role == 'admin':
             return True
-        return self.get_permissions().get(screen, False)
+        if not has_request_context():
+            return self.get_permissions().get(screen, False)
+        # Memoized for the request only, so permission edits apply on the next one
+        cache = g.setdefault('_perm_cache', {})
+        key = (self.id, screen)
+        if key not in cache:
+            cache[key] = self.get_permissions().get(screen, False)
+        return cache[key]
 
     # Relationships
     grpo_documents = relationship('GRPODocument',
@@ -115,6 +123,11 @@ class User(UserMixin, db.Model):
 
 class GRPODocument(db.Model):
     __tablename__ = 'grpo_documents'
+    __table_args__ = (
+        # Per-user document lists (newest first) and the per-user PO lookup
+        db.Index('idx_grpo_user_created', 'user_id', 'created_at'),
+        db.Index('idx_grpo_user_po', 'user_id', 'po_number'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     po_number = db.Column(db.String(20), nullable=False)
@@ -182,6 +195,9 @@ class GRPOItem(db.Model):
 
 class InventoryTransfer(db.Model):
     __tablename__ = 'inventory_transfers'
+    __table_args__ = (
+        db.Index('idx_transfer_user_created', 'user_id', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     transfer_request_number = db.Column(db.String(20), nullable=False)
@@ -212,7 +228,8 @@ class InventoryTransferItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     inventory_transfer_id = db.Column(db.Integer,
                                    db.ForeignKey('inventory_transfers.id'),
-                                   nullable=False)
+                                   nullable=False,
+                                   index=True)
     item_code = db.Column(db.String(50), nullable=False)
     item_name = db.Column(db.String(200), nullable=False)
     quantity = db.Column(db.Float, nullable=False)
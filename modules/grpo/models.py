@@ -9,6 +9,11 @@ from modules.shared.models import User
 class GRPODocument(db.Model):
     """Main GRPO document header"""
     __tablename__ = 'grpo_documents'
+    __table_args__ = (
+        # Per-user document lists (newest first) and the per-user PO lookup
+        db.Index('idx_grpo_user_created', 'user_id', 'created_at'),
+        db.Index('idx_grpo_user_po', 'user_id', 'po_number'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     po_number = db.Column(db.String(50), nullable=False)
@@ -19,7 +24,7 @@ class GRPODocument(db.Model):
     qc_approver_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     qc_approved_at = db.Column(db.DateTime)
     qc_notes = db.Column(db.Text)
-    status = db.Column(db.String(20), default='draft')  # draft, submitted, qc_approved, posted, rejected
+    status = db.Column(db.String(20), default='draft')  # draft, submitted, qc_approved, sap_posting, sap_post_failed, posted, rejected
     po_total = db.Column(db.Numeric(15, 2))
     sap_document_number = db.Column(db.String(50))
     notes = db.Column(db.Text)
@@ -2,16 +2,127 @@
 GRPO (Goods Receipt PO) Routes
 All routes related to goods receipt against purchase orders
 """
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app
 from flask_login import login_required, current_user
+from sqlalchemy.orm import load_only, selectinload
 from app import db
 from modules.grpo.models import GRPODocument, GRPOItem
 from modules.shared.models import User
+import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 
 grpo_bp = Blueprint('grpo', __name__, url_prefix='/grpo')
 
+def _json_error(message, status):
+    """Build a pre-serialized {'success': False, 'error': ...} response"""
+    body = json.dumps({'success': False, 'error': message}).encode('utf-8')
+    return body, status, {'Content-Type': 'application/json'}
+
+# Fixed validation failures are encoded once at import, not on every rejection
+_ERR_ACCESS_DENIED = _json_error('Access denied', 403)
+_ERR_NOT_DRAFT = _json_error('Only draft GRPOs can be submitted', 400)
+_ERR_NO_ITEMS = _json_error('Cannot submit GRPO without items', 400)
+_ERR_QC_REQUIRED = _json_error('QC permissions required', 403)
+_ERR_APPROVE_NOT_SUBMITTED = _json_error('Only submitted GRPOs can be approved', 400)
+_ERR_REJECT_NOT_SUBMITTED = _json_error('Only submitted GRPOs can be rejected', 400)
+_ERR_REASON_REQUIRED = _json_error('Rejection reason is required', 400)
+_ERR_RETRY_NOT_POSTABLE = _json_error('Only approved GRPOs not yet posted can be retried', 409)
+
+# SAP B1 postings run here so approvers don't hold a request worker and a
+# pooled DB connection for the length of a Service Layer call
+_SAP_POST_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='sap-grpo')
+
+# Statuses a SAP B1 posting may (re)start from; a queued job lost to a worker
+# restart leaves the document qc_approved, a failed one sap_post_failed
+_SAP_POSTABLE = ('qc_approved', 'sap_post_failed')
+
+# A sap_posting claim older than this belongs to a crashed or killed posting
+# (updated_at records when it was claimed) and may be taken over by retry
+_SAP_CLAIM_TIMEOUT = timedelta(minutes=10)
+
+def _sap_client(app):
+    """Shared SAP client when register_routes() set one up, else a fresh one"""
+    client = app.config.get('SAP_CLIENT')
+    if client is None:
+        from sap_integration import SAPIntegration
+        client = SAPIntegration()
+    return client
+
+def _is_stale_claim(grpo):
+    """True if grpo is stuck in sap_posting past _SAP_CLAIM_TIMEOUT"""
+    return (grpo.status == 'sap_posting' and grpo.updated_at is not None
+            and grpo.updated_at < datetime.utcnow() - _SAP_CLAIM_TIMEOUT)
+
+def _post_grpo(app, grpo_id, reclaim=False):
+    """Claim a postable GRPO, post it to SAP B1 and record the outcome.
+
+    With reclaim, a stale sap_posting claim is taken over too; SAP B1 is then
+    asked first whether the earlier attempt already created the delivery note.
+    Returns the SAP result dict, or None if the document was not postable
+    (already posted, being posted or not approved)."""
+    now = datetime.utcnow()
+    claimable = GRPODocument.status.in_(_SAP_POSTABLE)
+    if reclaim:
+        claimable = db.or_(claimable, db.and_(GRPODocument.status == 'sap_posting',
+                                              GRPODocument.updated_at < now - _SAP_CLAIM_TIMEOUT))
+    previous = GRPODocument.query.with_entities(GRPODocument.status, GRPODocument.updated_at) \
+        .filter_by(id=grpo_id).first()
+    
+    # Conditional UPDATE so the background job and a manual retry never both post
+    claimed = GRPODocument.query.filter(GRPODocument.id == grpo_id, claimable).update(
+        {GRPODocument.status: 'sap_posting', GRPODocument.updated_at: now},
+        synchronize_session=False)
+    db.session.commit()
+    if not claimed:
+        return None
+    
+    grpo = GRPODocument.query.options(selectinload(GRPODocument.items)).get(grpo_id)
+    sap = _sap_client(app)
+    try:
+        sap_result = None
+        if previous is not None and previous.status == 'sap_posting':
+            # The crashed attempt may have posted before its commit failed
+            existing = sap.find_delivery_note_for_po(grpo.po_number, previous.updated_at)
+            if not existing.get('success'):
+                # Leave the stale claim as it was so the next retry checks again
+                grpo.status = 'sap_posting'
+                grpo.updated_at = previous.updated_at
+                db.session.commit()
+                return {'success': False,
+                        'error': f"Could not check SAP B1 for an earlier posting: {existing.get('error')}"}
+            if existing.get('document_number'):
+                logging.info(f"GRPO {grpo_id} was already posted to SAP B1 as {existing['document_number']}")
+                sap_result = {'success': True, 'sap_document_number': str(existing['document_number'])}
+        if sap_result is None:
+            logging.info(f"🚀 Attempting to post GRPO {grpo_id} to SAP B1...")
+            sap_result = sap.post_grpo_to_sap(grpo)
+            logging.info(f"📡 SAP B1 posting result: {sap_result}")
+    except Exception as e:
+        sap_result = {'success': False, 'error': str(e)}
+    
+    if sap_result.get('success'):
+        grpo.sap_document_number = sap_result.get('sap_document_number')
+        grpo.status = 'posted'
+        logging.info(f"✅ GRPO {grpo_id} posted to SAP B1 as {grpo.sap_document_number}")
+    else:
+        # Recorded on the row so the status route shows it and retry() accepts it
+        grpo.status = 'sap_post_failed'
+        logging.warning(f"⚠️ GRPO {grpo_id} QC approved but SAP posting failed: "
+                        f"{sap_result.get('error', 'Unknown SAP error')}")
+    db.session.commit()
+    return sap_result
+
+def _post_grpo_to_sap(app, grpo_id):
+    """Background job: post a QC-approved GRPO to SAP B1"""
+    with app.app_context():
+        try:
+            _post_grpo(app, grpo_id)
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Error posting GRPO {grpo_id} to SAP B1: {str(e)}")
+
 @grpo_bp.route('/')
 @login_required
 def index():
@@ -20,14 +131,19 @@ def index():
         flash('Access denied - GRPO permissions required', 'error')
         return redirect(url_for('dashboard'))
     
-    grpos = GRPODocument.query.filter_by(user_id=current_user.id).order_by(GRPODocument.created_at.desc()).all()
-    return render_template('grpo/grpo.html', grpos=grpos)
+    page = request.args.get('page', 1, type=int)
+    # Only the columns the list shows
+    pagination = GRPODocument.query.filter_by(user_id=current_user.id).options(
+        load_only(GRPODocument.id, GRPODocument.po_number, GRPODocument.status,
+                  GRPODocument.sap_document_number, GRPODocument.created_at)
+    ).order_by(GRPODocument.created_at.desc()).paginate(page=page, per_page=25, error_out=False)
+    return render_template('grpo/grpo.html', documents=pagination.items, pagination=pagination)
 
 @grpo_bp.route('/detail/<int:grpo_id>')
 @login_required
 def detail(grpo_id):
     """GRPO detail page"""
-    grpo = GRPODocument.query.get_or_404(grpo_id)
+    grpo = GRPODocument.query.options(selectinload(GRPODocument.items)).filter_by(id=grpo_id).first_or_404()
     
     # Check permissions
     if grpo.user_id != current_user.id and current_user.role not in ['admin', 'manager', 'qc']:
@@ -78,17 +194,17 @@ def create():
 def submit(grpo_id):
     """Submit GRPO for QC approval"""
     try:
-        grpo = GRPODocument.query.get_or_404(grpo_id)
+        grpo = GRPODocument.query.options(selectinload(GRPODocument.items)).filter_by(id=grpo_id).first_or_404()
         
         # Check permissions
         if grpo.user_id != current_user.id:
-            return jsonify({'success': False, 'error': 'Access denied'}), 403
+            return _ERR_ACCESS_DENIED
         
         if grpo.status != 'draft':
-            return jsonify({'success': False, 'error': 'Only draft GRPOs can be submitted'}), 400
+            return _ERR_NOT_DRAFT
         
         if not grpo.items:
-            return jsonify({'success': False, 'error': 'Cannot submit GRPO without items'}), 400
+            return _ERR_NO_ITEMS
         
         # Update status
         grpo.status = 'submitted'
@@ -109,23 +225,24 @@ def submit(grpo_id):
 @grpo_bp.route('/<int:grpo_id>/approve', methods=['POST'])
 @login_required
 def approve(grpo_id):
-    """QC approve GRPO and post to SAP B1"""
+    """QC approve GRPO and queue its SAP B1 posting"""
     try:
+        # Items are updated in bulk below and only read by the background poster
         grpo = GRPODocument.query.get_or_404(grpo_id)
         
         # Check QC permissions
         if not current_user.has_permission('qc_dashboard') and current_user.role not in ['admin', 'manager']:
-            return jsonify({'success': False, 'error': 'QC permissions required'}), 403
+            return _ERR_QC_REQUIRED
         
         if grpo.status != 'submitted':
-            return jsonify({'success': False, 'error': 'Only submitted GRPOs can be approved'}), 400
+            return _ERR_APPROVE_NOT_SUBMITTED
         
         # Get QC notes
         qc_notes = request.form.get('qc_notes', '') if request.form else request.json.get('qc_notes', '')
         
-        # Mark items as approved
-        for item in grpo.items:
-            item.qc_status = 'approved'
+        # Mark items as approved in one UPDATE
+        approved_count = GRPOItem.query.filter(GRPOItem.grpo_id == grpo_id).update(
+            {GRPOItem.qc_status: 'approved'}, synchronize_session='evaluate')
         
         # Update GRPO status
         grpo.status = 'qc_approved'
@@ -133,45 +250,79 @@ def approve(grpo_id):
         grpo.qc_approved_at = datetime.utcnow()
         grpo.qc_notes = qc_notes
         
-        # Initialize SAP integration and post to SAP B1
-        from sap_integration import SAPIntegration
-        sap = SAPIntegration()
+        # Commit the QC decision first, then post to SAP B1 in the background
+        db.session.commit()
+        logging.info(f"GRPO {grpo_id} QC approved ({approved_count} items), queued for SAP B1 posting")
+        _SAP_POST_POOL.submit(_post_grpo_to_sap, current_app._get_current_object(), grpo_id)
         
-        # Log the posting attempt
-        logging.info(f"🚀 Attempting to post GRPO {grpo_id} to SAP B1...")
-        logging.info(f"GRPO Items: {len(grpo.items)} items, QC Approved: {len([i for i in grpo.items if i.qc_status == 'approved'])}")
+        return jsonify({
+            'success': True,
+            'message': 'GRPO approved; posting to SAP B1 in the background',
+            'status': 'qc_approved',
+            'status_url': url_for('grpo.status', grpo_id=grpo_id)
+        }), 202
         
-        # Post GRPO to SAP B1 as Purchase Delivery Note
-        sap_result = sap.post_grpo_to_sap(grpo)
+    except Exception as e:
+        logging.error(f"Error approving GRPO: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@grpo_bp.route('/<int:grpo_id>/status')
+@login_required
+def status(grpo_id):
+    """Poll a GRPO's status, e.g. after approve() queued its SAP posting"""
+    grpo = GRPODocument.query.get_or_404(grpo_id)
+    
+    # Same visibility rule as detail()
+    if grpo.user_id != current_user.id and current_user.role not in ['admin', 'manager', 'qc']:
+        return _ERR_ACCESS_DENIED
+    
+    response = {
+        'status': grpo.status,
+        'sap_document_number': grpo.sap_document_number
+    }
+    if grpo.status == 'sap_post_failed':
+        response['error'] = 'GRPO approved but SAP posting failed'
+    if grpo.status in _SAP_POSTABLE or _is_stale_claim(grpo):
+        response['retry_url'] = url_for('grpo.retry_sap_post', grpo_id=grpo_id)
+    return jsonify(response)
+
+@grpo_bp.route('/<int:grpo_id>/retry', methods=['POST'])
+@login_required
+def retry_sap_post(grpo_id):
+    """Post an approved GRPO whose SAP B1 posting failed, never ran or was cut off"""
+    try:
+        grpo = GRPODocument.query.get_or_404(grpo_id)
+        
+        # Check QC permissions
+        if not current_user.has_permission('qc_dashboard') and current_user.role not in ['admin', 'manager']:
+            return _ERR_QC_REQUIRED
+        
+        if grpo.status not in _SAP_POSTABLE and not _is_stale_claim(grpo):
+            return _ERR_RETRY_NOT_POSTABLE
         
-        # Log the result
-        logging.info(f"📡 SAP B1 posting result: {sap_result}")
+        # Retries post in the request so the approver sees SAP's answer directly
+        sap_result = _post_grpo(current_app._get_current_object(), grpo_id, reclaim=True)
+        if sap_result is None:
+            return _ERR_RETRY_NOT_POSTABLE
         
         if sap_result.get('success'):
-            grpo.sap_document_number = sap_result.get('sap_document_number')
-            grpo.status = 'posted'
-            db.session.commit()
-            
-            logging.info(f"✅ GRPO {grpo_id} QC approved and posted to SAP B1 as {grpo.sap_document_number}")
             return jsonify({
                 'success': True,
-                'message': f'GRPO approved and posted to SAP B1 as {grpo.sap_document_number}',
-                'sap_document_number': grpo.sap_document_number
-            })
-        else:
-            # If SAP posting fails, still mark as QC approved but not posted
-            db.session.commit()
-            error_msg = sap_result.get('error', 'Unknown SAP error')
-            
-            logging.warning(f"⚠️ GRPO {grpo_id} QC approved but SAP posting failed: {error_msg}")
-            return jsonify({
-                'success': False,
-                'error': f'GRPO approved but SAP posting failed: {error_msg}',
-                'status': 'qc_approved'
+                'message': f'GRPO posted to SAP B1 as {sap_result.get("sap_document_number")}',
+                'status': 'posted',
+                'sap_document_number': sap_result.get('sap_document_number')
             })
         
+        error_msg = sap_result.get('error', 'Unknown SAP error')
+        return jsonify({
+            'success': False,
+            'error': f'SAP posting failed: {error_msg}',
+            'status': 'sap_post_failed'
+        }), 502
+        
     except Exception as e:
-        logging.error(f"Error approving GRPO: {str(e)}")
+        db.session.rollback()
+        logging.error(f"Error retrying SAP posting for GRPO: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @grpo_bp.route('/<int:grpo_id>/reject', methods=['POST'])
@@ -179,24 +330,24 @@ def approve(grpo_id):
 def reject(grpo_id):
     """QC reject GRPO"""
     try:
-        grpo = GRPODocument.query.get_or_404(grpo_id)
+        grpo = GRPODocument.query.options(selectinload(GRPODocument.items)).filter_by(id=grpo_id).first_or_404()
         
         # Check QC permissions
         if not current_user.has_permission('qc_dashboard') and current_user.role not in ['admin', 'manager']:
-            return jsonify({'success': False, 'error': 'QC permissions required'}), 403
+            return _ERR_QC_REQUIRED
         
         if grpo.status != 'submitted':
-            return jsonify({'success': False, 'error': 'Only submitted GRPOs can be rejected'}), 400
+            return _ERR_REJECT_NOT_SUBMITTED
         
         # Get rejection reason
         qc_notes = request.form.get('qc_notes', '') if request.form else request.json.get('qc_notes', '')
         
         if not qc_notes:
-            return jsonify({'success': False, 'error': 'Rejection reason is required'}), 400
+            return _ERR_REASON_REQUIRED
         
-        # Mark items as rejected
-        for item in grpo.items:
-            item.qc_status = 'rejected'
+        # Mark items as rejected in one UPDATE
+        GRPOItem.query.filter(GRPOItem.grpo_id == grpo_id).update(
+            {GRPOItem.qc_status: 'rejected'}, synchronize_session='evaluate')
         
         # Update GRPO status
         grpo.status = 'rejected'
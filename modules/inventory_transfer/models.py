@@ -9,6 +9,9 @@ from modules.shared.models import User
 class InventoryTransfer(db.Model):
     """Main inventory transfer document header"""
     __tablename__ = 'inventory_transfers'
+    __table_args__ = (
+        db.Index('idx_transfer_user_created', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     transfer_request_number = db.Column(db.String(50), nullable=False)
@@ -36,6 +39,13 @@ class InventoryTransfer(db.Model):
 class InventoryTransferItem(db.Model):
     """Inventory transfer line items"""
     __tablename__ = 'inventory_transfer_items'
+    __table_args__ = (
+        db.Index('idx_item_transfer', 'transfer_id'),
+        # Reconciliation lookups by item/batch and by source location
+        db.Index('idx_item_code_batch', 'item_code', 'batch_number'),
+        db.Index('idx_item_from_location', 'from_warehouse_code', 'from_bin'),
+        {'mysql_engine': 'InnoDB', 'mysql_row_format': 'DYNAMIC', 'mysql_charset': 'utf8mb4'}
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     transfer_id = db.Column(db.Integer, db.ForeignKey('inventory_transfers.id'), nullable=False)
@@ -62,6 +72,10 @@ class InventoryTransferItem(db.Model):
 class TransferStatusHistory(db.Model):
     """Track status changes for inventory transfers"""
     __tablename__ = 'transfer_status_history'
+    __table_args__ = (
+        # History tab reads a transfer's changes in order
+        db.Index('idx_history_transfer_changed', 'transfer_id', 'changed_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     transfer_id = db.Column(db.Integer, db.ForeignKey('inventory_transfers.id'), nullable=False)
@@ -7,6 +7,14 @@ from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 
+# Built once at import instead of on every has_permission() call
+ROLE_PERMISSIONS = {
+    'admin': frozenset(['dashboard', 'grpo', 'inventory_transfer', 'pick_list', 'inventory_counting', 'qc_dashboard', 'barcode_labels']),
+    'manager': frozenset(['dashboard', 'grpo', 'inventory_transfer', 'pick_list', 'inventory_counting', 'qc_dashboard', 'barcode_labels']),
+    'qc': frozenset(['dashboard', 'qc_dashboard', 'barcode_labels']),
+    'user': frozenset(['dashboard', 'grpo', 'inventory_transfer', 'pick_list', 'inventory_counting', 'barcode_labels']),
+}
+
 class User(UserMixin, db.Model):
     """User model for authentication and authorization"""
     id = db.Column(db.Integer, primary_key=True)
@@ -23,7 +31,7 @@ class User(UserMixin, db.Model):
 
     def set_password(self, password):
         """Set password hash"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(password, method='scrypt')
 
     def check_password(self, password):
         """Check password against hash"""
@@ -31,13 +39,7 @@ class User(UserMixin, db.Model):
 
     def has_permission(self, permission):
         """Check if user has specific permission"""
-        role_permissions = {
-            'admin': ['dashboard', 'grpo', 'inventory_transfer', 'pick_list', 'inventory_counting', 'qc_dashboard', 'barcode_labels'],
-            'manager': ['dashboard', 'grpo', 'inventory_transfer', 'pick_list', 'inventory_counting', 'qc_dashboard', 'barcode_labels'],
-            'qc': ['dashboard', 'qc_dashboard', 'barcode_labels'],
-            'user': ['dashboard', 'grpo', 'inventory_transfer', 'pick_list', 'inventory_counting', 'barcode_labels']
-        }
-        return permission in role_permissions.get(self.role, [])
+        return permission in ROLE_PERMISSIONS.get(self.role, ())
 
 class Warehouse(db.Model):
     """Warehouse master data"""
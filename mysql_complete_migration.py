@@ -5,31 +5,337 @@ This script fixes the column issues and creates a complete database schema.
 """
 
 import os
+import re
+import subprocess
 import sys
-import mysql.connector
-from mysql.connector import Error
-import getpass
+# mysql.connector and getpass are imported where they are used, so the module
+# loads without the connector and main() can install it if it is missing
 
-def create_env_file():
+# Default rows seeded by create_tables()
+# werkzeug scrypt hash of 'admin123', computed once and reused for every seeded
+# account so seeding never pays a KDF evaluation per user
+DEFAULT_PASSWORD_HASH = (
+    "scrypt:32768:8:1$ZRPRvMVWm5EBp4G1$"
+    "e50d47a0b891fc570e9da631b149ce4c81fe4eac758bfb7593da025295905fd8"
+    "a56219d2b1e5fb1123c5addaef974e376345e11fc68eded5c9ecd9a4f039dd05"
+)
+SEED_USERS = [
+    ('admin', 'admin@wms.local', DEFAULT_PASSWORD_HASH,
+     'admin', True, 'HQ001', 'HQ001',
+     '{"can_manage_users": true, "can_approve_grpo": true, "can_approve_transfers": true, "can_manage_inventory": true}'),
+]
+SEED_BRANCHES = [
+    ('HQ001', 'Head Office', 'Main headquarters branch', True),
+]
+SEED_SERIES = [
+    ('GRPO', 'GRPO-', 1, True),
+    ('TRANSFER', 'TR-', 1, True),
+    ('PICKLIST', 'PL-', 1, True),
+]
+
+_CREATE_RE = re.compile(r'CREATE TABLE (?:IF NOT EXISTS )?(\w+)')
+_DB_NAME_RE = re.compile(r'[A-Za-z0-9_]{1,64}')
+
+_AUTO_ID = "id INT AUTO_INCREMENT PRIMARY KEY"
+_CREATED_AT = "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
+_UPDATED_AT = "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
+
+def render_table(name, columns, constraints=(), created_at=True, updated_at=True,
+                 primary_key=_AUTO_ID, if_not_exists=True):
+    """Assemble a CREATE TABLE statement around the shared id/timestamp columns"""
+    definitions = [primary_key, *columns]
+    if created_at:
+        definitions.append(_CREATED_AT)
+    if updated_at:
+        definitions.append(_UPDATED_AT)
+    definitions.extend(constraints)
+    create = "CREATE TABLE IF NOT EXISTS" if if_not_exists else "CREATE TABLE"
+    return f"{create} {name} (\n    " + ",\n    ".join(definitions) + "\n)"
+
+# Schema created by create_tables(), in dependency order, as
+# (progress message, DDL) pairs; users is dropped first and recreated
+TABLE_DDL = [
+    ('Users table created with all columns', render_table(
+        'users',
+        ['username VARCHAR(64) UNIQUE NOT NULL',
+         'email VARCHAR(120) UNIQUE NOT NULL',
+         'password_hash VARCHAR(256)',
+         'first_name VARCHAR(80)',
+         'last_name VARCHAR(80)',
+         "user_role ENUM('admin', 'manager', 'user', 'qc') DEFAULT 'user'",
+         'branch_id VARCHAR(20)',
+         'branch_name VARCHAR(100)',
+         'default_branch_id VARCHAR(20)',
+         'user_is_active BOOLEAN DEFAULT TRUE',
+         'must_change_password BOOLEAN DEFAULT FALSE',
+         'last_login TIMESTAMP NULL',
+         'permissions TEXT'],
+        # username/email are already indexed by their UNIQUE keys
+        constraints=['INDEX idx_branch (branch_id)'],
+        if_not_exists=False)),
+    ('GRPO Documents table created', render_table(
+        'grpo_documents',
+        ['po_number VARCHAR(20) NOT NULL',
+         'sap_document_number VARCHAR(50)',
+         'supplier_code VARCHAR(20)',
+         'supplier_name VARCHAR(100)',
+         'po_date DATE',
+         'po_total DECIMAL(15,2)',
+         "status ENUM('draft', 'approved', 'posted', 'rejected') DEFAULT 'draft'",
+         'user_id INT NOT NULL',
+         'qc_user_id INT',
+         'qc_notes TEXT',
+         'notes TEXT',
+         "draft_or_post VARCHAR(20) DEFAULT 'draft'"],
+        constraints=['FOREIGN KEY (user_id) REFERENCES users(id)',
+                     'FOREIGN KEY (qc_user_id) REFERENCES users(id)',
+                     'INDEX idx_po_number (po_number)',
+                     'INDEX idx_status (status)',
+                     'INDEX idx_user (user_id)'])),
+    ('GRPO Items table created', render_table(
+        'grpo_items',
+        ['grpo_document_id INT NOT NULL',
+         'item_code VARCHAR(50) NOT NULL',
+         'item_name VARCHAR(200) NOT NULL',
+         'ordered_quantity DECIMAL(10,3) NOT NULL',
+         'received_quantity DECIMAL(10,3) NOT NULL',
+         'unit_of_measure VARCHAR(10) NOT NULL',
+         'bin_location VARCHAR(20) NOT NULL',
+         'batch_number VARCHAR(50)',
+         'serial_number VARCHAR(50)',
+         'expiration_date DATE',
+         'barcode VARCHAR(100)'],
+        constraints=['FOREIGN KEY (grpo_document_id) REFERENCES grpo_documents(id) ON DELETE CASCADE',
+                     'INDEX idx_grpo_doc (grpo_document_id)',
+                     'INDEX idx_item_code (item_code)',
+                     'INDEX idx_batch (batch_number)'],
+        updated_at=False)),
+    ('Inventory Transfers table created', render_table(
+        'inventory_transfers',
+        ['transfer_request_number VARCHAR(20) NOT NULL',
+         'sap_document_number VARCHAR(20)',
+         "status ENUM('draft', 'submitted', 'qc_approved', 'posted', 'rejected') DEFAULT 'draft'",
+         'user_id INT NOT NULL',
+         'qc_approver_id INT',
+         'qc_approved_at TIMESTAMP NULL',
+         'qc_notes TEXT',
+         'from_warehouse VARCHAR(20)',
+         'to_warehouse VARCHAR(20)'],
+        constraints=['FOREIGN KEY (user_id) REFERENCES users(id)',
+                     'FOREIGN KEY (qc_approver_id) REFERENCES users(id)',
+                     'INDEX idx_transfer_request (transfer_request_number)',
+                     'INDEX idx_status (status)',
+                     'INDEX idx_user (user_id)'])),
+    ('Inventory Transfer Items table created', render_table(
+        'inventory_transfer_items',
+        ['inventory_transfer_id INT NOT NULL',
+         'item_code VARCHAR(50) NOT NULL',
+         'item_name VARCHAR(200) NOT NULL',
+         'quantity DECIMAL(10,3) NOT NULL',
+         'requested_quantity DECIMAL(10,3) NOT NULL',
+         'transferred_quantity DECIMAL(10,3) DEFAULT 0',
+         'remaining_quantity DECIMAL(10,3) NOT NULL',
+         'unit_of_measure VARCHAR(10) NOT NULL',
+         'from_bin VARCHAR(20) NOT NULL',
+         'to_bin VARCHAR(20) NOT NULL',
+         'batch_number VARCHAR(50)',
+         'available_batches TEXT',
+         "qc_status ENUM('pending', 'approved', 'rejected') DEFAULT 'pending'",
+         'qc_notes TEXT',
+         'serial_number VARCHAR(50)'],
+        constraints=['FOREIGN KEY (inventory_transfer_id) REFERENCES inventory_transfers(id) ON DELETE CASCADE',
+                     'INDEX idx_transfer (inventory_transfer_id)',
+                     'INDEX idx_item_code (item_code)',
+                     'INDEX idx_qc_status (qc_status)'],
+        updated_at=False)),
+    ('Pick Lists table created', render_table(
+        'pick_lists',
+        ['sales_order_number VARCHAR(20) NOT NULL',
+         'pick_list_number VARCHAR(20) NOT NULL',
+         "status ENUM('pending', 'approved', 'rejected', 'completed') DEFAULT 'pending'",
+         'user_id INT NOT NULL',
+         'approver_id INT'],
+        constraints=['FOREIGN KEY (user_id) REFERENCES users(id)',
+                     'FOREIGN KEY (approver_id) REFERENCES users(id)',
+                     'INDEX idx_sales_order (sales_order_number)',
+                     'INDEX idx_pick_list (pick_list_number)',
+                     'INDEX idx_status (status)'])),
+    ('Pick List Items table created', render_table(
+        'pick_list_items',
+        ['pick_list_id INT NOT NULL',
+         'item_code VARCHAR(50) NOT NULL',
+         'item_name VARCHAR(200) NOT NULL',
+         'quantity DECIMAL(10,3) NOT NULL',
+         'picked_quantity DECIMAL(10,3) DEFAULT 0',
+         'unit_of_measure VARCHAR(10) NOT NULL',
+         'bin_location VARCHAR(20) NOT NULL',
+         'batch_number VARCHAR(50)'],
+        constraints=['FOREIGN KEY (pick_list_id) REFERENCES pick_lists(id) ON DELETE CASCADE',
+                     'INDEX idx_pick_list (pick_list_id)',
+                     'INDEX idx_item_code (item_code)'],
+        updated_at=False)),
+    ('Inventory Counts table created', render_table(
+        'inventory_counts',
+        ['count_reference VARCHAR(20) NOT NULL',
+         'warehouse_code VARCHAR(20) NOT NULL',
+         "status ENUM('draft', 'approved', 'posted', 'rejected') DEFAULT 'draft'",
+         'user_id INT NOT NULL',
+         'approver_id INT'],
+        constraints=['FOREIGN KEY (user_id) REFERENCES users(id)',
+                     'FOREIGN KEY (approver_id) REFERENCES users(id)',
+                     'INDEX idx_count_ref (count_reference)',
+                     'INDEX idx_warehouse (warehouse_code)',
+                     'INDEX idx_status (status)'])),
+    ('Inventory Count Items table created', render_table(
+        'inventory_count_items',
+        ['inventory_count_id INT NOT NULL',
+         'item_code VARCHAR(50) NOT NULL',
+         'item_name VARCHAR(200) NOT NULL',
+         'system_quantity DECIMAL(10,3) NOT NULL',
+         'counted_quantity DECIMAL(10,3) NOT NULL',
+         'variance DECIMAL(10,3) NOT NULL',
+         'unit_of_measure VARCHAR(10) NOT NULL',
+         'batch_number VARCHAR(50)'],
+        constraints=['FOREIGN KEY (inventory_count_id) REFERENCES inventory_counts(id) ON DELETE CASCADE',
+                     'INDEX idx_count (inventory_count_id)',
+                     'INDEX idx_item_code (item_code)'],
+        updated_at=False)),
+    ('Barcode Labels table created', render_table(
+        'barcode_labels',
+        ['item_code VARCHAR(50) NOT NULL',
+         'barcode VARCHAR(100) NOT NULL',
+         'label_format VARCHAR(20) NOT NULL',
+         'print_count INT DEFAULT 0',
+         'created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP',
+         'last_printed TIMESTAMP NULL'],
+        constraints=['INDEX idx_item_code (item_code)',
+                     'INDEX idx_barcode (barcode)'],
+        created_at=False,
+        updated_at=False)),
+    ('Bin Locations table created', render_table(
+        'bin_locations',
+        ['bin_code VARCHAR(100) UNIQUE NOT NULL',
+         'warehouse_code VARCHAR(50) NOT NULL',
+         'description VARCHAR(255)',
+         'is_active BOOLEAN DEFAULT TRUE',
+         'is_system_bin BOOLEAN DEFAULT FALSE',
+         'sap_abs_entry INT'],
+        constraints=['INDEX idx_warehouse (warehouse_code)'])),
+    ('Bin Items table created', render_table(
+        'bin_items',
+        ['bin_code VARCHAR(100) NOT NULL',
+         'item_code VARCHAR(100) NOT NULL',
+         'item_name VARCHAR(255)',
+         'batch_number VARCHAR(100)',
+         'quantity DECIMAL(15,3) DEFAULT 0',
+         'available_quantity DECIMAL(15,3) DEFAULT 0',
+         'committed_quantity DECIMAL(15,3) DEFAULT 0',
+         "uom VARCHAR(20) DEFAULT 'EA'",
+         'expiry_date DATE',
+         'manufacturing_date DATE',
+         'admission_date DATE',
+         'warehouse_code VARCHAR(50)',
+         'sap_abs_entry INT',
+         'sap_system_number INT',
+         'sap_doc_entry INT',
+         'batch_attribute1 VARCHAR(100)',
+         'batch_attribute2 VARCHAR(100)',
+         "batch_status VARCHAR(50) DEFAULT 'bdsStatus_Released'",
+         'last_sap_sync TIMESTAMP DEFAULT CURRENT_TIMESTAMP'],
+        constraints=['FOREIGN KEY (bin_code) REFERENCES bin_locations(bin_code)',
+                     'INDEX idx_bin_code (bin_code)',
+                     'INDEX idx_item_code (item_code)',
+                     'INDEX idx_batch (batch_number)'])),
+    ('Bin Scanning Logs table created', render_table(
+        'bin_scanning_logs',
+        ['bin_code VARCHAR(100) NOT NULL',
+         'user_id INT NOT NULL',
+         'scan_type VARCHAR(50) NOT NULL',
+         'scan_data TEXT',
+         'items_found INT DEFAULT 0',
+         'scan_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP'],
+        constraints=['FOREIGN KEY (user_id) REFERENCES users(id)',
+                     'INDEX idx_bin_code (bin_code)',
+                     'INDEX idx_user (user_id)',
+                     'INDEX idx_scan_time (scan_timestamp)'],
+        created_at=False,
+        updated_at=False)),
+    ('Document Number Series table created', render_table(
+        'document_number_series',
+        ['document_type VARCHAR(20) NOT NULL UNIQUE',
+         'prefix VARCHAR(10) NOT NULL',
+         'current_number INT DEFAULT 1',
+         'year_suffix BOOLEAN DEFAULT TRUE'])),
+    ('Branches table created', render_table(
+        'branches',
+        ['name VARCHAR(100) NOT NULL',
+         'description TEXT',
+         'address TEXT',
+         'phone VARCHAR(20)',
+         'email VARCHAR(100)',
+         'manager_name VARCHAR(100)',
+         'is_active BOOLEAN DEFAULT TRUE',
+         'is_default BOOLEAN DEFAULT FALSE'],
+        primary_key='id VARCHAR(20) PRIMARY KEY')),
+]
+
+def _ask(prompt, value, default="", secret=False, interactive=True):
+    """Use a value given on the command line/environment, else prompt for it"""
+    if value is not None:
+        return value
+    if not interactive:
+        return default
+    if secret:
+        import getpass
+        return getpass.getpass(prompt) or default
+    return input(prompt) or default
+
+def parse_args(argv=None):
+    """Command line overrides; each defaults to the matching environment variable"""
+    import argparse
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description="Create the WMS MySQL schema and .env file")
+    parser.add_argument("--host", default=env("MYSQL_HOST"))
+    parser.add_argument("--port", default=env("MYSQL_PORT"))
+    parser.add_argument("--user", default=env("MYSQL_USER"))
+    parser.add_argument("--password-env", default="MYSQL_PASSWORD",
+                        help="environment variable holding the MySQL password")
+    parser.add_argument("--database", default=env("MYSQL_DATABASE"))
+    parser.add_argument("--sap-server", default=env("SAP_B1_SERVER"))
+    parser.add_argument("--sap-username", default=env("SAP_B1_USERNAME"))
+    parser.add_argument("--sap-password-env", default="SAP_B1_PASSWORD",
+                        help="environment variable holding the SAP B1 password")
+    parser.add_argument("--sap-company-db", default=env("SAP_B1_COMPANY_DB"))
+    parser.add_argument("--session-secret", default=env("SESSION_SECRET"))
+    return parser.parse_args(argv)
+
+def create_env_file(args=None):
     """Create .env file with MySQL configuration"""
+    if args is None:
+        args = parse_args([])
+    # Without a terminal (CI, scripted runs) missing values take their defaults
+    interactive = sys.stdin.isatty()
     print("Creating .env file for MySQL configuration...")
     
     # Get MySQL connection details
-    mysql_host = input("Enter MySQL Host (default: localhost): ") or "localhost"
-    mysql_port = input("Enter MySQL Port (default: 3306): ") or "3306"
-    mysql_user = input("Enter MySQL Username (default: root): ") or "root"
-    mysql_password = getpass.getpass("Enter MySQL Password: ")
-    mysql_database = input("Enter MySQL Database Name (default: wms_db): ") or "wms_db"
+    mysql_host = _ask("Enter MySQL Host (default: localhost): ", args.host, "localhost", interactive=interactive)
+    mysql_port = _ask("Enter MySQL Port (default: 3306): ", args.port, "3306", interactive=interactive)
+    mysql_user = _ask("Enter MySQL Username (default: root): ", args.user, "root", interactive=interactive)
+    mysql_password = _ask("Enter MySQL Password: ", os.environ.get(args.password_env), secret=True, interactive=interactive)
+    mysql_database = _ask("Enter MySQL Database Name (default: wms_db): ", args.database, "wms_db", interactive=interactive)
     
     # SAP B1 Configuration
-    print("\nSAP B1 Configuration (optional):")
-    sap_server = input("Enter SAP B1 Server URL (optional): ") or ""
-    sap_username = input("Enter SAP B1 Username (optional): ") or ""
-    sap_password = getpass.getpass("Enter SAP B1 Password (optional): ") if sap_username else ""
-    sap_company_db = input("Enter SAP B1 Company Database (optional): ") or ""
+    if interactive:
+        print("\nSAP B1 Configuration (optional):")
+    sap_server = _ask("Enter SAP B1 Server URL (optional): ", args.sap_server, interactive=interactive)
+    sap_username = _ask("Enter SAP B1 Username (optional): ", args.sap_username, interactive=interactive)
+    sap_password = _ask("Enter SAP B1 Password (optional): ", os.environ.get(args.sap_password_env),
+                        secret=True, interactive=interactive) if sap_username else ""
+    sap_company_db = _ask("Enter SAP B1 Company Database (optional): ", args.sap_company_db, interactive=interactive)
     
     # Session secret
-    session_secret = input("Enter Session Secret (default: your-secret-key-here): ") or "your-secret-key-here"
+    session_secret = _ask("Enter Session Secret (default: your-secret-key-here): ", args.session_secret,
+                          "your-secret-key-here", interactive=interactive)
     
     env_content = f"""# Database Configuration - MySQL Primary
 DATABASE_URL=mysql+pymysql://{mysql_user}:{mysql_password}@{mysql_host}:{mysql_port}/{mysql_database}
@@ -58,401 +364,142 @@ FLASK_ENV=development
 FLASK_DEBUG=True
 """
     
-    with open('.env', 'w') as f:
-        f.write(env_content)
+    # One write, owner-only permissions: the file holds MySQL and SAP passwords
+    fd = os.open('.env', os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.write(fd, env_content.encode('utf-8'))
+    finally:
+        os.close(fd)
     
     print("✅ .env file created successfully!")
     return mysql_host, mysql_port, mysql_user, mysql_password, mysql_database
 
-def create_database(host, port, user, password, database):
-    """Create MySQL database if it doesn't exist"""
+def _probe(host, port, timeout=2):
+    """Return True if a TCP connection to host:port opens within timeout seconds"""
+    import socket
     try:
-        # Connect to MySQL server (without specifying database)
-        connection = mysql.connector.connect(
+        socket.create_connection((host, int(port)), timeout=timeout).close()
+        return True
+    except (OSError, ValueError):
+        return False
+
+def connect_server(host, port, user, password):
+    """Open the one server connection both migration steps share"""
+    # Fail fast on a mistyped host/port instead of waiting out the driver's timeout
+    if not _probe(host, port):
+        print(f"❌ Cannot reach MySQL at {host}:{port}")
+        return None
+    
+    import mysql.connector
+    from mysql.connector import Error
+    from mysql.connector.constants import ClientFlag
+    if not mysql.connector.HAVE_CEXT:
+        print("⚠️ MySQL connector C extension not available, using the slower pure-Python protocol")
+    try:
+        # No database yet: create_database() makes it and selects it
+        return mysql.connector.connect(
             host=host,
             port=port,
             user=user,
-            password=password
+            password=password,
+            use_pure=not mysql.connector.HAVE_CEXT,
+            charset='utf8mb4',
+            autocommit=False,
+            client_flags=[ClientFlag.MULTI_STATEMENTS]
         )
+    except Error as e:
+        print(f"❌ Error connecting to MySQL: {e}")
+        return None
+
+def create_database(connection, database):
+    """Create MySQL database if it doesn't exist and switch to it"""
+    from mysql.connector import Error
+    # Identifiers can't be bound as parameters, so only plain names are accepted
+    if not _DB_NAME_RE.fullmatch(database):
+        print(f"❌ Invalid database name: {database!r} (letters, digits and _ only)")
+        return False
+    try:
+        cursor = connection.cursor()
         
-        if connection.is_connected():
-            cursor = connection.cursor()
-            
-            # Create database if it doesn't exist
-            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
-            print(f"✅ Database '{database}' created or already exists")
-            
-            cursor.close()
-            connection.close()
-            
+        # Create database if it doesn't exist and USE it on this connection, in
+        # one round trip, so create_tables doesn't reconnect
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}` DEFAULT CHARACTER SET utf8mb4;\n"
+                       f"USE `{database}`")
+        for _ in cursor.fetchsets():
+            pass
+        print(f"✅ Database '{database}' created or already exists")
+        
+        cursor.close()
         return True
         
     except Error as e:
         print(f"❌ Error creating database: {e}")
         return False
 
-def create_tables(host, port, user, password, database):
+def create_tables(connection):
     """Create all required tables with complete schema"""
+    from mysql.connector import Error
     try:
-        # Connect to the specific database
-        connection = mysql.connector.connect(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database
-        )
-        
         if connection.is_connected():
             cursor = connection.cursor()
             
-            # Drop and recreate users table with all required columns
-            cursor.execute("DROP TABLE IF EXISTS users")
-            cursor.execute("""
-                CREATE TABLE users (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    username VARCHAR(64) UNIQUE NOT NULL,
-                    email VARCHAR(120) UNIQUE NOT NULL,
-                    password_hash VARCHAR(256),
-                    first_name VARCHAR(80),
-                    last_name VARCHAR(80),
-                    user_role ENUM('admin', 'manager', 'user', 'qc') DEFAULT 'user',
-                    branch_id VARCHAR(20),
-                    branch_name VARCHAR(100),
-                    default_branch_id VARCHAR(20),
-                    user_is_active BOOLEAN DEFAULT TRUE,
-                    must_change_password BOOLEAN DEFAULT FALSE,
-                    last_login TIMESTAMP NULL,
-                    permissions TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_username (username),
-                    INDEX idx_email (email),
-                    INDEX idx_branch (branch_id)
-                )
-            """)
-            print("✅ Users table created with all columns")
-            
-            # Create all other tables...
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS grpo_documents (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    po_number VARCHAR(20) NOT NULL,
-                    sap_document_number VARCHAR(50),
-                    supplier_code VARCHAR(20),
-                    supplier_name VARCHAR(100),
-                    po_date DATE,
-                    po_total DECIMAL(15,2),
-                    status ENUM('draft', 'approved', 'posted', 'rejected') DEFAULT 'draft',
-                    user_id INT NOT NULL,
-                    qc_user_id INT,
-                    qc_notes TEXT,
-                    notes TEXT,
-                    draft_or_post VARCHAR(20) DEFAULT 'draft',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id),
-                    FOREIGN KEY (qc_user_id) REFERENCES users(id),
-                    INDEX idx_po_number (po_number),
-                    INDEX idx_status (status),
-                    INDEX idx_user (user_id)
-                )
-            """)
-            print("✅ GRPO Documents table created")
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS grpo_items (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    grpo_document_id INT NOT NULL,
-                    item_code VARCHAR(50) NOT NULL,
-                    item_name VARCHAR(200) NOT NULL,
-                    ordered_quantity DECIMAL(10,3) NOT NULL,
-                    received_quantity DECIMAL(10,3) NOT NULL,
-                    unit_of_measure VARCHAR(10) NOT NULL,
-                    bin_location VARCHAR(20) NOT NULL,
-                    batch_number VARCHAR(50),
-                    serial_number VARCHAR(50),
-                    expiration_date DATE,
-                    barcode VARCHAR(100),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (grpo_document_id) REFERENCES grpo_documents(id) ON DELETE CASCADE,
-                    INDEX idx_grpo_doc (grpo_document_id),
-                    INDEX idx_item_code (item_code),
-                    INDEX idx_batch (batch_number)
-                )
-            """)
-            print("✅ GRPO Items table created")
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS inventory_transfers (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    transfer_request_number VARCHAR(20) NOT NULL,
-                    sap_document_number VARCHAR(20),
-                    status ENUM('draft', 'submitted', 'qc_approved', 'posted', 'rejected') DEFAULT 'draft',
-                    user_id INT NOT NULL,
-                    qc_approver_id INT,
-                    qc_approved_at TIMESTAMP NULL,
-                    qc_notes TEXT,
-                    from_warehouse VARCHAR(20),
-                    to_warehouse VARCHAR(20),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id),
-                    FOREIGN KEY (qc_approver_id) REFERENCES users(id),
-                    INDEX idx_transfer_request (transfer_request_number),
-                    INDEX idx_status (status),
-                    INDEX idx_user (user_id)
-                )
-            """)
-            print("✅ Inventory Transfers table created")
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS inventory_transfer_items (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    inventory_transfer_id INT NOT NULL,
-                    item_code VARCHAR(50) NOT NULL,
-                    item_name VARCHAR(200) NOT NULL,
-                    quantity DECIMAL(10,3) NOT NULL,
-                    requested_quantity DECIMAL(10,3) NOT NULL,
-                    transferred_quantity DECIMAL(10,3) DEFAULT 0,
-                    remaining_quantity DECIMAL(10,3) NOT NULL,
-                    unit_of_measure VARCHAR(10) NOT NULL,
-                    from_bin VARCHAR(20) NOT NULL,
-                    to_bin VARCHAR(20) NOT NULL,
-                    batch_number VARCHAR(50),
-                    available_batches TEXT,
-                    qc_status ENUM('pending', 'approved', 'rejected') DEFAULT 'pending',
-                    qc_notes TEXT,
-                    serial_number VARCHAR(50),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (inventory_transfer_id) REFERENCES inventory_transfers(id) ON DELETE CASCADE,
-                    INDEX idx_transfer (inventory_transfer_id),
-                    INDEX idx_item_code (item_code),
-                    INDEX idx_qc_status (qc_status)
-                )
-            """)
-            print("✅ Inventory Transfer Items table created")
+            # One information_schema read tells us which tables are already there
+            cursor.execute(
+                "SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()")
+            existing = {row[0].lower() for row in cursor.fetchall()}
             
-            # Continue with other tables...
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS pick_lists (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    sales_order_number VARCHAR(20) NOT NULL,
-                    pick_list_number VARCHAR(20) NOT NULL,
-                    status ENUM('pending', 'approved', 'rejected', 'completed') DEFAULT 'pending',
-                    user_id INT NOT NULL,
-                    approver_id INT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id),
-                    FOREIGN KEY (approver_id) REFERENCES users(id),
-                    INDEX idx_sales_order (sales_order_number),
-                    INDEX idx_pick_list (pick_list_number),
-                    INDEX idx_status (status)
-                )
-            """)
-            print("✅ Pick Lists table created")
+            # Recreate users (dropping it only if present) and create the other
+            # missing tables, as one multi-statement script: one round trip
+            # instead of one per table. FK and unique checks are off only while
+            # the DDL runs (which also lets users be dropped while other tables
+            # reference it) and back on before the INSERT IGNORE seeds, which
+            # rely on unique keys.
+            statements = ["SET SESSION FOREIGN_KEY_CHECKS = 0", "SET SESSION UNIQUE_CHECKS = 0"]
+            if 'users' in existing:
+                statements.append("DROP TABLE users")
+            log = []
+            for message, ddl in TABLE_DDL:
+                table = _CREATE_RE.match(ddl).group(1)
+                if table != 'users' and table in existing:
+                    log.append(f"✓ Table already exists: {table}\n")
+                    continue
+                statements.append(ddl)
+                log.append(f"✅ {message}\n")
+            statements += ["SET SESSION UNIQUE_CHECKS = 1", "SET SESSION FOREIGN_KEY_CHECKS = 1"]
+            cursor.execute(";\n".join(statements))
+            for _ in cursor.fetchsets():
+                pass
             
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS pick_list_items (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    pick_list_id INT NOT NULL,
-                    item_code VARCHAR(50) NOT NULL,
-                    item_name VARCHAR(200) NOT NULL,
-                    quantity DECIMAL(10,3) NOT NULL,
-                    picked_quantity DECIMAL(10,3) DEFAULT 0,
-                    unit_of_measure VARCHAR(10) NOT NULL,
-                    bin_location VARCHAR(20) NOT NULL,
-                    batch_number VARCHAR(50),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (pick_list_id) REFERENCES pick_lists(id) ON DELETE CASCADE,
-                    INDEX idx_pick_list (pick_list_id),
-                    INDEX idx_item_code (item_code)
-                )
-            """)
-            print("✅ Pick List Items table created")
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS inventory_counts (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    count_reference VARCHAR(20) NOT NULL,
-                    warehouse_code VARCHAR(20) NOT NULL,
-                    status ENUM('draft', 'approved', 'posted', 'rejected') DEFAULT 'draft',
-                    user_id INT NOT NULL,
-                    approver_id INT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id),
-                    FOREIGN KEY (approver_id) REFERENCES users(id),
-                    INDEX idx_count_ref (count_reference),
-                    INDEX idx_warehouse (warehouse_code),
-                    INDEX idx_status (status)
-                )
-            """)
-            print("✅ Inventory Counts table created")
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS inventory_count_items (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    inventory_count_id INT NOT NULL,
-                    item_code VARCHAR(50) NOT NULL,
-                    item_name VARCHAR(200) NOT NULL,
-                    system_quantity DECIMAL(10,3) NOT NULL,
-                    counted_quantity DECIMAL(10,3) NOT NULL,
-                    variance DECIMAL(10,3) NOT NULL,
-                    unit_of_measure VARCHAR(10) NOT NULL,
-                    batch_number VARCHAR(50),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (inventory_count_id) REFERENCES inventory_counts(id) ON DELETE CASCADE,
-                    INDEX idx_count (inventory_count_id),
-                    INDEX idx_item_code (item_code)
-                )
-            """)
-            print("✅ Inventory Count Items table created")
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS barcode_labels (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    item_code VARCHAR(50) NOT NULL,
-                    barcode VARCHAR(100) NOT NULL,
-                    label_format VARCHAR(20) NOT NULL,
-                    print_count INT DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_printed TIMESTAMP NULL,
-                    INDEX idx_item_code (item_code),
-                    INDEX idx_barcode (barcode)
-                )
-            """)
-            print("✅ Barcode Labels table created")
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS bin_locations (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    bin_code VARCHAR(100) UNIQUE NOT NULL,
-                    warehouse_code VARCHAR(50) NOT NULL,
-                    description VARCHAR(255),
-                    is_active BOOLEAN DEFAULT TRUE,
-                    is_system_bin BOOLEAN DEFAULT FALSE,
-                    sap_abs_entry INT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_bin_code (bin_code),
-                    INDEX idx_warehouse (warehouse_code)
-                )
-            """)
-            print("✅ Bin Locations table created")
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS bin_items (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    bin_code VARCHAR(100) NOT NULL,
-                    item_code VARCHAR(100) NOT NULL,
-                    item_name VARCHAR(255),
-                    batch_number VARCHAR(100),
-                    quantity DECIMAL(15,3) DEFAULT 0,
-                    available_quantity DECIMAL(15,3) DEFAULT 0,
-                    committed_quantity DECIMAL(15,3) DEFAULT 0,
-                    uom VARCHAR(20) DEFAULT 'EA',
-                    expiry_date DATE,
-                    manufacturing_date DATE,
-                    admission_date DATE,
-                    warehouse_code VARCHAR(50),
-                    sap_abs_entry INT,
-                    sap_system_number INT,
-                    sap_doc_entry INT,
-                    batch_attribute1 VARCHAR(100),
-                    batch_attribute2 VARCHAR(100),
-                    batch_status VARCHAR(50) DEFAULT 'bdsStatus_Released',
-                    last_sap_sync TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    FOREIGN KEY (bin_code) REFERENCES bin_locations(bin_code),
-                    INDEX idx_bin_code (bin_code),
-                    INDEX idx_item_code (item_code),
-                    INDEX idx_batch (batch_number)
-                )
-            """)
-            print("✅ Bin Items table created")
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS bin_scanning_logs (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    bin_code VARCHAR(100) NOT NULL,
-                    user_id INT NOT NULL,
-                    scan_type VARCHAR(50) NOT NULL,
-                    scan_data TEXT,
-                    items_found INT DEFAULT 0,
-                    scan_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id),
-                    INDEX idx_bin_code (bin_code),
-                    INDEX idx_user (user_id),
-                    INDEX idx_scan_time (scan_timestamp)
-                )
-            """)
-            print("✅ Bin Scanning Logs table created")
-            
-            # Add Document Number Series table for automatic document numbering
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS document_number_series (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    document_type VARCHAR(20) NOT NULL UNIQUE,
-                    prefix VARCHAR(10) NOT NULL,
-                    current_number INT DEFAULT 1,
-                    year_suffix BOOLEAN DEFAULT TRUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_document_type (document_type)
-                )
-            """)
-            print("✅ Document Number Series table created")
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS branches (
-                    id VARCHAR(20) PRIMARY KEY,
-                    name VARCHAR(100) NOT NULL,
-                    description TEXT,
-                    address TEXT,
-                    phone VARCHAR(20),
-                    email VARCHAR(100),
-                    manager_name VARCHAR(100),
-                    is_active BOOLEAN DEFAULT TRUE,
-                    is_default BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                )
-            """)
-            print("✅ Branches table created")
-            
-            # Insert default data
-            cursor.execute("""
+            # Insert default data in one transaction, committed once below;
+            # executemany sends each table's rows as a single multi-row INSERT
+            cursor.executemany("""
                 INSERT IGNORE INTO users (username, email, password_hash, user_role, user_is_active, branch_id, default_branch_id, permissions)
-                VALUES ('admin', 'admin@wms.local', 'scrypt:32768:8:1$MGJhMlBF7UJHUzBr$9e1c9b8e5f4a3d2c1b0a9876543210fedcba0987654321fedcba09876543210abcdef123456789abcdef1234567890abcdef', 'admin', TRUE, 'HQ001', 'HQ001', '{"can_manage_users": true, "can_approve_grpo": true, "can_approve_transfers": true, "can_manage_inventory": true}')
-            """)
-            print("✅ Default admin user created (username: admin, password: admin123)")
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """, SEED_USERS)
+            log.append("✅ Default admin user created (username: admin, password: admin123)\n")
             
-            cursor.execute("""
+            cursor.executemany("""
                 INSERT IGNORE INTO branches (id, name, description, is_active)
-                VALUES ('HQ001', 'Head Office', 'Main headquarters branch', TRUE)
-            """)
-            print("✅ Default branch created")
+                VALUES (%s, %s, %s, %s)
+            """, SEED_BRANCHES)
+            log.append("✅ Default branch created\n")
             
             # Insert default document number series
-            cursor.execute("""
+            cursor.executemany("""
                 INSERT IGNORE INTO document_number_series (document_type, prefix, current_number, year_suffix)
-                VALUES 
-                ('GRPO', 'GRPO-', 1, TRUE),
-                ('TRANSFER', 'TR-', 1, TRUE),
-                ('PICKLIST', 'PL-', 1, TRUE)
-            """)
-            print("✅ Default document number series created")
+                VALUES (%s, %s, %s, %s)
+            """, SEED_SERIES)
+            log.append("✅ Default document number series created\n")
             
             connection.commit()
             cursor.close()
-            connection.close()
             
-            print("\n🎉 All tables created successfully with proper columns!")
-            print("✅ Cascading dropdown functionality implemented")
-            print("✅ Item Code → Warehouse → Bin Location → Batch cascading flow ready")
+            log.append("\n🎉 All tables created successfully with proper columns!\n")
+            log.append("✅ Cascading dropdown functionality implemented\n")
+            log.append("✅ Item Code → Warehouse → Bin Location → Batch cascading flow ready\n")
+            # Progress is reported in one write once the work is done
+            sys.stdout.write("".join(log))
+            sys.stdout.flush()
             return True
             
     except Error as e:
@@ -461,6 +508,7 @@ def create_tables(host, port, user, password, database):
 
 def main():
     """Main migration function"""
+    args = parse_args()
     print("=" * 60)
     print("   WMS Fixed MySQL Migration Script")
     print("=" * 60)
@@ -471,25 +519,30 @@ def main():
         import mysql.connector
     except ImportError:
         print("❌ MySQL connector not found. Installing...")
-        os.system("pip install mysql-connector-python")
+        subprocess.run([sys.executable, "-m", "pip", "install", "--quiet", "mysql-connector-python"],
+                       check=True)
         import mysql.connector
     
     # Step 1: Create .env file
-    host, port, user, password, database = create_env_file()
+    host, port, user, password, database = create_env_file(args)
     print()
     
     # Step 2: Create database
     print("Creating MySQL database...")
-    if not create_database(host, port, user, password, database):
+    connection = connect_server(host, port, user, password)
+    if connection is None or not create_database(connection, database):
         print("❌ Failed to create database. Exiting.")
         sys.exit(1)
     print()
     
     # Step 3: Create tables
     print("Creating database tables...")
-    if not create_tables(host, port, user, password, database):
-        print("❌ Failed to create tables. Exiting.")
-        sys.exit(1)
+    try:
+        if not create_tables(connection):
+            print("❌ Failed to create tables. Exiting.")
+            sys.exit(1)
+    finally:
+        connection.close()
     print()
     
     print("=" * 60)
@@ -4,10 +4,301 @@ This script creates all tables and inserts default admin user.
 """
 
 import os
+import re
 import mysql.connector
+from mysql.connector.constants import ClientFlag
 from werkzeug.security import generate_password_hash
 from datetime import datetime
 
+# Complete schema, sent to the server as one multi-statement query
+CREATE_TABLES_SQL = """
+-- Users table
+CREATE TABLE IF NOT EXISTS users (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    username VARCHAR(80) UNIQUE NOT NULL,
+    email VARCHAR(120) UNIQUE NOT NULL,
+    password_hash VARCHAR(256) NOT NULL,
+    first_name VARCHAR(80),
+    last_name VARCHAR(80),
+    role VARCHAR(20) NOT NULL DEFAULT 'user',
+    branch_id VARCHAR(10),
+    branch_name VARCHAR(100),
+    default_branch_id VARCHAR(10),
+    user_is_active BOOLEAN DEFAULT TRUE,
+    must_change_password BOOLEAN DEFAULT FALSE,
+    last_login DATETIME,
+    permissions VARCHAR(1024),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Branches table
+CREATE TABLE IF NOT EXISTS branches (
+    id VARCHAR(10) PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    description TEXT,
+    address TEXT,
+    phone VARCHAR(20),
+    email VARCHAR(100),
+    manager_name VARCHAR(100),
+    is_active BOOLEAN DEFAULT TRUE,
+    is_default BOOLEAN DEFAULT FALSE,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+
+
+-- GRN Documents table
+CREATE TABLE IF NOT EXISTS grn_documents (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    grn_number VARCHAR(50) UNIQUE,
+    po_number VARCHAR(20) NOT NULL,
+    sap_document_number VARCHAR(20),
+    supplier_code VARCHAR(50),
+    supplier_name VARCHAR(200),
+    po_date DATETIME,
+    po_total DECIMAL(15,2),
+    status VARCHAR(20) DEFAULT 'draft',
+    user_id INT NOT NULL,
+    qc_approver_id INT,
+    qc_approved_at DATETIME,
+    qc_notes TEXT,
+    notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    FOREIGN KEY (qc_approver_id) REFERENCES users(id)
+);
+
+-- GRN Items table
+CREATE TABLE IF NOT EXISTS grn_items (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    grn_document_id INT NOT NULL,
+    item_code VARCHAR(50) NOT NULL,
+    item_name VARCHAR(200),
+    received_quantity DECIMAL(15,3) DEFAULT 0,
+    ordered_quantity DECIMAL(15,3) DEFAULT 0,
+    unit_of_measure VARCHAR(10),
+    bin_location VARCHAR(100),
+    batch_number VARCHAR(50),
+    serial_number VARCHAR(50),
+    expiration_date DATE,
+    notes TEXT,
+    warehouse_code VARCHAR(20),
+    qc_status VARCHAR(20) DEFAULT 'pending',
+    qc_notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (grn_document_id) REFERENCES grn_documents(id) ON DELETE CASCADE
+);
+
+-- Inventory Transfers table
+CREATE TABLE IF NOT EXISTS inventory_transfers (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    transfer_number VARCHAR(50) UNIQUE,
+    transfer_request_number VARCHAR(50),
+    from_warehouse VARCHAR(20),
+    to_warehouse VARCHAR(20),
+    status VARCHAR(20) DEFAULT 'draft',
+    user_id INT NOT NULL,
+    qc_approver_id INT,
+    qc_approved_at DATETIME,
+    qc_notes TEXT,
+    notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    FOREIGN KEY (qc_approver_id) REFERENCES users(id)
+);
+
+-- Inventory Transfer Items table
+CREATE TABLE IF NOT EXISTS inventory_transfer_items (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    transfer_id INT NOT NULL,
+    item_code VARCHAR(50) NOT NULL,
+    item_name VARCHAR(200),
+    requested_quantity DECIMAL(15,3) DEFAULT 0,
+    transferred_quantity DECIMAL(15,3) DEFAULT 0,
+    unit_of_measure VARCHAR(10),
+    from_bin_location VARCHAR(100),
+    to_bin_location VARCHAR(100),
+    batch_number VARCHAR(50),
+    serial_number VARCHAR(50),
+    notes TEXT,
+    qc_status VARCHAR(20) DEFAULT 'pending',
+    qc_notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (transfer_id) REFERENCES inventory_transfers(id) ON DELETE CASCADE
+);
+
+-- Pick Lists table
+CREATE TABLE IF NOT EXISTS pick_lists (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    pick_list_number VARCHAR(50) UNIQUE,
+    sales_order_number VARCHAR(50),
+    customer_code VARCHAR(50),
+    customer_name VARCHAR(200),
+    status VARCHAR(20) DEFAULT 'draft',
+    priority VARCHAR(20) DEFAULT 'normal',
+    user_id INT NOT NULL,
+    completed_at DATETIME,
+    notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Pick List Items table
+CREATE TABLE IF NOT EXISTS pick_list_items (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    pick_list_id INT NOT NULL,
+    item_code VARCHAR(50) NOT NULL,
+    item_name VARCHAR(200),
+    ordered_quantity DECIMAL(15,3) DEFAULT 0,
+    picked_quantity DECIMAL(15,3) DEFAULT 0,
+    unit_of_measure VARCHAR(10),
+    bin_location VARCHAR(100),
+    batch_number VARCHAR(50),
+    serial_number VARCHAR(50),
+    notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (pick_list_id) REFERENCES pick_lists(id) ON DELETE CASCADE
+);
+
+-- Inventory Counts table
+CREATE TABLE IF NOT EXISTS inventory_counts (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    count_number VARCHAR(50) UNIQUE,
+    warehouse_code VARCHAR(20),
+    status VARCHAR(20) DEFAULT 'draft',
+    user_id INT NOT NULL,
+    completed_at DATETIME,
+    notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Inventory Count Items table
+CREATE TABLE IF NOT EXISTS inventory_count_items (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    count_id INT NOT NULL,
+    item_code VARCHAR(50) NOT NULL,
+    item_name VARCHAR(200),
+    bin_location VARCHAR(100),
+    batch_number VARCHAR(50),
+    system_quantity DECIMAL(15,3) DEFAULT 0,
+    counted_quantity DECIMAL(15,3) DEFAULT 0,
+    variance DECIMAL(15,3) DEFAULT 0,
+    unit_of_measure VARCHAR(10),
+    notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (count_id) REFERENCES inventory_counts(id) ON DELETE CASCADE
+);
+
+-- Barcode Labels table
+CREATE TABLE IF NOT EXISTS barcode_labels (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    item_code VARCHAR(50) NOT NULL,
+    item_name VARCHAR(200),
+    batch_number VARCHAR(50),
+    barcode VARCHAR(100) UNIQUE NOT NULL,
+    label_format VARCHAR(20) DEFAULT 'standard',
+    printed_by INT,
+    printed_at DATETIME,
+    reprint_count INT DEFAULT 0,
+    notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (printed_by) REFERENCES users(id)
+);
+
+-- Bin Scanning Logs table
+CREATE TABLE IF NOT EXISTS bin_scanning_logs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    bin_code VARCHAR(50) NOT NULL,
+    warehouse_code VARCHAR(20),
+    scanned_by INT NOT NULL,
+    scan_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    items_found INT DEFAULT 0,
+    notes TEXT,
+    FOREIGN KEY (scanned_by) REFERENCES users(id)
+);
+
+-- User Sessions table
+CREATE TABLE IF NOT EXISTS user_sessions (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    session_token VARCHAR(256) NOT NULL,
+    branch_id VARCHAR(10),
+    login_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+    logout_time DATETIME,
+    ip_address VARCHAR(45),
+    user_agent TEXT,
+    is_active BOOLEAN DEFAULT TRUE,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Password Reset Tokens table
+CREATE TABLE IF NOT EXISTS password_reset_tokens (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    token VARCHAR(256) UNIQUE NOT NULL,
+    expires_at DATETIME NOT NULL,
+    used BOOLEAN DEFAULT FALSE,
+    created_by INT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    FOREIGN KEY (created_by) REFERENCES users(id)
+);
+
+-- Document Number Series table
+CREATE TABLE IF NOT EXISTS document_number_series (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    document_type VARCHAR(20) UNIQUE NOT NULL,
+    prefix VARCHAR(10) NOT NULL,
+    current_number INT DEFAULT 1,
+    year_suffix BOOLEAN DEFAULT TRUE,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+"""
+
+# Optional schema-only dump (e.g. `mysqldump --no-data`) used in place of the
+# inline DDL, only when WMS_SCHEMA_FILE names it explicitly
+SCHEMA_FILE_ENV = 'WMS_SCHEMA_FILE'
+
+# Dumps carry DROP statements and bare CREATE TABLEs; neither is safe to re-run
+_DROP_RE = re.compile(r'^\s*DROP\s+(?:TABLE|DATABASE|SCHEMA)\b[^;]*;[ \t]*\n?', re.I | re.M)
+_CREATE_RE = re.compile(r'\bCREATE\s+TABLE\s+(?!IF\s+NOT\s+EXISTS\b)', re.I)
+
+def load_schema():
+    """Return the WMS_SCHEMA_FILE dump made re-runnable, else the inline DDL"""
+    path = os.environ.get(SCHEMA_FILE_ENV)
+    if not path:
+        return CREATE_TABLES_SQL
+    with open(path, encoding='utf-8') as f:
+        schema = f.read()
+    schema, dropped = _DROP_RE.subn('', schema)
+    if dropped:
+        print(f"⚠️ Skipped {dropped} DROP statement(s) from {path}")
+    print(f"📄 Using schema from {path}")
+    return _CREATE_RE.sub('CREATE TABLE IF NOT EXISTS ', schema)
+
+# Rows per INSERT/commit when seeding; large seeders stay in bounded transactions
+COMMIT_BATCH = 50
+
+def insert_batched(connection, cursor, sql, rows, batch_size=COMMIT_BATCH):
+    """executemany() rows in chunks of batch_size, committing after each full chunk"""
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        cursor.executemany(sql, chunk)
+        if len(chunk) == batch_size:
+            connection.commit()
+
 def create_mysql_database():
     """Create complete MySQL database with all tables and default data"""
     
@@ -18,7 +309,9 @@ def create_mysql_database():
         'user': input("MySQL Username: ").strip(),
         'password': input("MySQL Password: ").strip(),
         'database': input("MySQL Database Name: ").strip(),
-        'autocommit': True
+        # DDL commits implicitly; the seed rows are committed explicitly below
+        'autocommit': False,
+        'client_flags': [ClientFlag.MULTI_STATEMENTS]
     }
     
     try:
@@ -27,6 +320,11 @@ def create_mysql_database():
         cursor = connection.cursor()
         print(f"✅ Connected to MySQL database: {config['database']}")
         
+        # Skip FK validation while the schema and seed rows go in, restored before
+        # the connection is handed back below. unique_checks stays on: re-runs
+        # rely on the unique keys to turn the seed INSERT IGNOREs into no-ops
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        
         # Create .env file
         env_content = f"""# Database Configuration for MySQL
 DATABASE_URL=mysql+pymysql://{config['user']}:{config['password']}@{config['host']}:{config['port']}/{config['database']}
@@ -45,265 +343,16 @@ SESSION_SECRET=your-secret-key-here-change-in-production
             f.write(env_content)
         print("✅ Created .env file with MySQL configuration")
         
-        # Drop existing tables to recreate fresh
-
-        
-
-        # Create all tables
-        create_tables_sql = """
-        -- Users table
-        CREATE TABLE users (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            username VARCHAR(80) UNIQUE NOT NULL,
-            email VARCHAR(120) UNIQUE NOT NULL,
-            password_hash VARCHAR(256) NOT NULL,
-            first_name VARCHAR(80),
-            last_name VARCHAR(80),
-            role VARCHAR(20) NOT NULL DEFAULT 'user',
-            branch_id VARCHAR(10),
-            branch_name VARCHAR(100),
-            default_branch_id VARCHAR(10),
-            user_is_active BOOLEAN DEFAULT TRUE,
-            must_change_password BOOLEAN DEFAULT FALSE,
-            last_login DATETIME,
-            permissions TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-        );
-
-        -- Branches table
-        CREATE TABLE branches (
-            id VARCHAR(10) PRIMARY KEY,
-            name VARCHAR(100) NOT NULL,
-            description TEXT,
-            address TEXT,
-            phone VARCHAR(20),
-            email VARCHAR(100),
-            manager_name VARCHAR(100),
-            is_active BOOLEAN DEFAULT TRUE,
-            is_default BOOLEAN DEFAULT FALSE,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-        );
-
-        
-
-        -- GRN Documents table
-        CREATE TABLE grn_documents (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            grn_number VARCHAR(50) UNIQUE,
-            po_number VARCHAR(20) NOT NULL,
-            sap_document_number VARCHAR(20),
-            supplier_code VARCHAR(50),
-            supplier_name VARCHAR(200),
-            po_date DATETIME,
-            po_total DECIMAL(15,2),
-            status VARCHAR(20) DEFAULT 'draft',
-            user_id INT NOT NULL,
-            qc_approver_id INT,
-            qc_approved_at DATETIME,
-            qc_notes TEXT,
-            notes TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id),
-            FOREIGN KEY (qc_approver_id) REFERENCES users(id)
-        );
-
-        -- GRN Items table
-        CREATE TABLE grn_items (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            grn_document_id INT NOT NULL,
-            item_code VARCHAR(50) NOT NULL,
-            item_name VARCHAR(200),
-            received_quantity DECIMAL(15,3) DEFAULT 0,
-            ordered_quantity DECIMAL(15,3) DEFAULT 0,
-            unit_of_measure VARCHAR(10),
-            bin_location VARCHAR(100),
-            batch_number VARCHAR(50),
-            serial_number VARCHAR(50),
-            expiration_date DATE,
-            notes TEXT,
-            warehouse_code VARCHAR(20),
-            qc_status VARCHAR(20) DEFAULT 'pending',
-            qc_notes TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            FOREIGN KEY (grn_document_id) REFERENCES grn_documents(id) ON DELETE CASCADE
-        );
-
-        -- Inventory Transfers table
-        CREATE TABLE inventory_transfers (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            transfer_number VARCHAR(50) UNIQUE,
-            transfer_request_number VARCHAR(50),
-            from_warehouse VARCHAR(20),
-            to_warehouse VARCHAR(20),
-            status VARCHAR(20) DEFAULT 'draft',
-            user_id INT NOT NULL,
-            qc_approver_id INT,
-            qc_approved_at DATETIME,
-            qc_notes TEXT,
-            notes TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id),
-            FOREIGN KEY (qc_approver_id) REFERENCES users(id)
-        );
-
-        -- Inventory Transfer Items table
-        CREATE TABLE inventory_transfer_items (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            transfer_id INT NOT NULL,
-            item_code VARCHAR(50) NOT NULL,
-            item_name VARCHAR(200),
-            requested_quantity DECIMAL(15,3) DEFAULT 0,
-            transferred_quantity DECIMAL(15,3) DEFAULT 0,
-            unit_of_measure VARCHAR(10),
-            from_bin_location VARCHAR(100),
-            to_bin_location VARCHAR(100),
-            batch_number VARCHAR(50),
-            serial_number VARCHAR(50),
-            notes TEXT,
-            qc_status VARCHAR(20) DEFAULT 'pending',
-            qc_notes TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            FOREIGN KEY (transfer_id) REFERENCES inventory_transfers(id) ON DELETE CASCADE
-        );
-
-        -- Pick Lists table
-        CREATE TABLE pick_lists (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            pick_list_number VARCHAR(50) UNIQUE,
-            sales_order_number VARCHAR(50),
-            customer_code VARCHAR(50),
-            customer_name VARCHAR(200),
-            status VARCHAR(20) DEFAULT 'draft',
-            priority VARCHAR(20) DEFAULT 'normal',
-            user_id INT NOT NULL,
-            completed_at DATETIME,
-            notes TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        );
-
-        -- Pick List Items table
-        CREATE TABLE pick_list_items (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            pick_list_id INT NOT NULL,
-            item_code VARCHAR(50) NOT NULL,
-            item_name VARCHAR(200),
-            ordered_quantity DECIMAL(15,3) DEFAULT 0,
-            picked_quantity DECIMAL(15,3) DEFAULT 0,
-            unit_of_measure VARCHAR(10),
-            bin_location VARCHAR(100),
-            batch_number VARCHAR(50),
-            serial_number VARCHAR(50),
-            notes TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            FOREIGN KEY (pick_list_id) REFERENCES pick_lists(id) ON DELETE CASCADE
-        );
-
-        -- Inventory Counts table
-        CREATE TABLE inventory_counts (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            count_number VARCHAR(50) UNIQUE,
-            warehouse_code VARCHAR(20),
-            status VARCHAR(20) DEFAULT 'draft',
-            user_id INT NOT NULL,
-            completed_at DATETIME,
-            notes TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        );
-
-        -- Inventory Count Items table
-        CREATE TABLE inventory_count_items (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            count_id INT NOT NULL,
-            item_code VARCHAR(50) NOT NULL,
-            item_name VARCHAR(200),
-            bin_location VARCHAR(100),
-            batch_number VARCHAR(50),
-            system_quantity DECIMAL(15,3) DEFAULT 0,
-            counted_quantity DECIMAL(15,3) DEFAULT 0,
-            variance DECIMAL(15,3) DEFAULT 0,
-            unit_of_measure VARCHAR(10),
-            notes TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            FOREIGN KEY (count_id) REFERENCES inventory_counts(id) ON DELETE CASCADE
-        );
-
-        -- Barcode Labels table
-        CREATE TABLE barcode_labels (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            item_code VARCHAR(50) NOT NULL,
-            item_name VARCHAR(200),
-            batch_number VARCHAR(50),
-            barcode VARCHAR(100) UNIQUE NOT NULL,
-            label_format VARCHAR(20) DEFAULT 'standard',
-            printed_by INT,
-            printed_at DATETIME,
-            reprint_count INT DEFAULT 0,
-            notes TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (printed_by) REFERENCES users(id)
-        );
-
-        -- Bin Scanning Logs table
-        CREATE TABLE bin_scanning_logs (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            bin_code VARCHAR(50) NOT NULL,
-            warehouse_code VARCHAR(20),
-            scanned_by INT NOT NULL,
-            scan_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            items_found INT DEFAULT 0,
-            notes TEXT,
-            FOREIGN KEY (scanned_by) REFERENCES users(id)
-        );
-
-        -- User Sessions table
-        CREATE TABLE user_sessions (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            user_id INT NOT NULL,
-            session_token VARCHAR(256) NOT NULL,
-            branch_id VARCHAR(10),
-            login_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-            logout_time DATETIME,
-            ip_address VARCHAR(45),
-            user_agent TEXT,
-            is_active BOOLEAN DEFAULT TRUE,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        );
-
-        -- Password Reset Tokens table
-        CREATE TABLE password_reset_tokens (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            user_id INT NOT NULL,
-            token VARCHAR(256) UNIQUE NOT NULL,
-            expires_at DATETIME NOT NULL,
-            used BOOLEAN DEFAULT FALSE,
-            created_by INT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id),
-            FOREIGN KEY (created_by) REFERENCES users(id)
-        );
-        """
-        
-        # Execute table creation
-        for statement in create_tables_sql.split(';'):
-            if statement.strip():
-                cursor.execute(statement)
+        # Execute table creation as one multi-statement round trip, draining
+        # every result before moving on; IF NOT EXISTS makes re-runs cheap no-ops
+        cursor.execute(load_schema())
+        for _ in cursor.fetchsets():
+            pass
         print("✅ Created all database tables")
         
         # Insert default branch
         cursor.execute("""
-            INSERT INTO branches (id, name, description, address, phone, email, manager_name, is_active, is_default)
+            INSERT IGNORE INTO branches (id, name, description, address, phone, email, manager_name, is_active, is_default)
             VALUES ('BR001', 'Main Branch', 'Head Office Branch', 'Main Office Address', '+1234567890', 'admin@company.com', 'System Administrator', TRUE, TRUE)
         """)
         print("✅ Created default branch")
@@ -315,16 +364,24 @@ SESSION_SECRET=your-secret-key-here-change-in-production
             ('PICKLIST', 'PL-', 0, True),
             ('COUNT', 'CNT-', 0, True)
         ]
+        insert_batched(connection, cursor, """
+            INSERT IGNORE INTO document_number_series (document_type, prefix, current_number, year_suffix)
+            VALUES (%s, %s, %s, %s)
+        """, document_series)
+        print("✅ Created document number series")
         
 
         # Create default admin user
-        admin_password_hash = generate_password_hash('admin123')
+        admin_password_hash = generate_password_hash('admin123', method='scrypt')
         cursor.execute("""
-            INSERT INTO users (username, email, password_hash, first_name, last_name, role, branch_id, default_branch_id, user_is_active)
+            INSERT IGNORE INTO users (username, email, password_hash, first_name, last_name, role, branch_id, default_branch_id, user_is_active)
             VALUES ('admin', 'admin@company.com', %s, 'System', 'Administrator', 'admin', 'BR001', 'BR001', TRUE)
         """, (admin_password_hash,))
         print("✅ Created default admin user (admin/admin123)")
         
+        # Branch, any partial series batch and admin user commit together
+        connection.commit()
+        cursor.execute("SET SESSION foreign_key_checks = 1")
         connection.close()
         print("\n🎉 MySQL database migration completed successfully!")
         print("\nDefault Login Credentials:")
@@ -346,6 +403,8 @@ if __name__ == "__main__":
     print("=" * 50)
     print("This script will create all tables and default admin user.")
     print("Make sure MySQL server is running and you have the credentials ready.")
+    print("Tip: for large imports, an admin can temporarily run")
+    print("     SET GLOBAL innodb_flush_log_at_trx_commit = 2 and restore it to 1 afterwards.")
     print()
     
     if input("Continue? (y/n): ").lower().strip() == 'y':
@@ -4,8 +4,10 @@ MySQL QR Code Migration Script
 Creates QR code labels table in MySQL database to maintain dual database support
 """
 
+import csv
 import os
-import pymysql
+import tempfile
+from mysql.connector import Error, pooling
 import logging
 from datetime import datetime
 
@@ -13,21 +15,69 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Column order of the sample INSERTs
+SAMPLE_COLUMNS = ('label_type', 'item_code', 'item_name', 'po_number', 'batch_number',
+                  'warehouse_code', 'qr_content', 'qr_format', 'user_id')
+
+# Batches at least this big go through LOAD DATA LOCAL INFILE
+LOAD_DATA_MIN_ROWS = 1000
+
+_pool = None
+
 def get_mysql_connection():
-    """Get MySQL database connection"""
+    """Get a pooled MySQL database connection; close() hands it back to the pool"""
+    global _pool
     try:
-        connection = pymysql.connect(
-            host=os.environ.get('MYSQL_HOST', 'localhost'),
-            user=os.environ.get('MYSQL_USER', 'root'),
-            password=os.environ.get('MYSQL_PASSWORD', ''),
-            database=os.environ.get('MYSQL_DATABASE', 'wms_db'),
-            charset='utf8mb4'
-        )
-        return connection
+        if _pool is None:
+            _pool = pooling.MySQLConnectionPool(
+                pool_name='wms_qr_migration',
+                # The pool opens every slot up front; this script uses one at a time
+                pool_size=1,
+                host=os.environ.get('MYSQL_HOST', 'localhost'),
+                user=os.environ.get('MYSQL_USER', 'root'),
+                password=os.environ.get('MYSQL_PASSWORD', ''),
+                database=os.environ.get('MYSQL_DATABASE', 'wms_db'),
+                charset='utf8mb4',
+                # Pooled connections ignore attribute writes, so set it here
+                autocommit=False,
+                allow_local_infile=True  # for insert_rows() on large batches
+            )
+        return _pool.get_connection()
     except Exception as e:
         logger.error(f"Failed to connect to MySQL: {e}")
         return None
 
+def _csv_row(row):
+    """Encode one row for LOAD DATA the way executemany() would bind it"""
+    # With no escape character, an unquoted NULL loads as SQL NULL; bools go in
+    # as 0/1 rather than the strings 'True'/'False'
+    return ['NULL' if v is None else int(v) if isinstance(v, bool) else v for v in row]
+
+def insert_rows(cursor, insert_sql, rows):
+    """Insert QR label rows, bulk-loading large batches from a temporary CSV
+
+    Falls back to executemany() with insert_sql for small batches or when the
+    server has local_infile disabled.
+    """
+    if len(rows) >= LOAD_DATA_MIN_ROWS:
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', encoding='utf-8',
+                                         delete=False) as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerows(map(_csv_row, rows))
+            path = f.name
+        try:
+            cursor.execute(
+                "LOAD DATA LOCAL INFILE %s INTO TABLE qr_code_labels CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                "LINES TERMINATED BY '\\n' "
+                f"({', '.join(SAMPLE_COLUMNS)})", (path,))
+            return
+        except Error as e:
+            logger.warning(f"LOAD DATA LOCAL INFILE unavailable ({e}), using INSERT instead")
+        finally:
+            os.remove(path)
+    cursor.executemany(insert_sql, rows)
+
 def create_qr_code_table_mysql():
     """Create QR code labels table in MySQL"""
     
@@ -68,7 +118,6 @@ def create_qr_code_table_mysql():
         cursor.execute(create_table_sql)
         connection.commit()
         cursor.close()
-        connection.close()
         
         logger.info("✅ QR code labels table created successfully in MySQL")
         return True
@@ -76,6 +125,9 @@ def create_qr_code_table_mysql():
     except Exception as e:
         logger.error(f"❌ Failed to create QR code table in MySQL: {e}")
         return False
+    finally:
+        # Hand the only pool slot back, or the next get_connection() fails
+        connection.close()
 
 def add_sample_qr_data_mysql():
     """Add sample QR code data to MySQL"""
@@ -108,33 +160,24 @@ def add_sample_qr_data_mysql():
     """
     
     try:
+        # All samples in one transaction with a single commit
         cursor = connection.cursor()
         
-        for sample in sample_data:
-            values = (
-                sample['label_type'],
-                sample['item_code'],
-                sample['item_name'],
-                sample['po_number'],
-                sample['batch_number'],
-                sample['warehouse_code'],
-                sample['qr_content'],
-                sample['qr_format'],
-                sample['user_id']
-            )
-            
-            cursor.execute(insert_sql, values)
+        insert_rows(cursor, insert_sql, [tuple(sample[column] for column in SAMPLE_COLUMNS)
+                                         for sample in sample_data])
         
         connection.commit()
         cursor.close()
-        connection.close()
         
         logger.info("✅ Sample QR code data added to MySQL")
         return True
         
     except Exception as e:
+        connection.rollback()
         logger.error(f"❌ Failed to add sample QR code data to MySQL: {e}")
         return False
+    finally:
+        connection.close()
 
 def main():
     """Run MySQL QR code migration"""
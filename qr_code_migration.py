@@ -13,7 +13,11 @@ from db_dual_support import get_database_connections
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def create_qr_code_labels_table():
+# Column order of the sample INSERTs
+SAMPLE_COLUMNS = ('label_type', 'item_code', 'item_name', 'po_number', 'batch_number',
+                  'warehouse_code', 'qr_content', 'qr_format', 'user_id')
+
+def create_qr_code_labels_table(connections=None):
     """Create qr_code_labels table in both SQLite and MySQL databases"""
     
     create_table_sql = """
@@ -76,7 +80,8 @@ def create_qr_code_labels_table():
     success_count = 0
     
     try:
-        connections = get_database_connections()
+        if connections is None:
+            connections = get_database_connections()
         
         for db_name, conn in connections.items():
             if conn:
@@ -105,7 +110,7 @@ def create_qr_code_labels_table():
     
     return success_count > 0
 
-def add_sample_qr_codes():
+def add_sample_qr_codes(connections=None):
     """Add sample QR code data for testing"""
     
     sample_data = [
@@ -135,36 +140,25 @@ def add_sample_qr_codes():
     """
     
     try:
-        connections = get_database_connections()
+        if connections is None:
+            connections = get_database_connections()
         
         for db_name, conn in connections.items():
             if conn:
                 try:
                     cursor = conn.cursor()
                     
-                    for sample in sample_data:
-                        values = (
-                            sample['label_type'],
-                            sample['item_code'],
-                            sample['item_name'],
-                            sample['po_number'],
-                            sample['batch_number'],
-                            sample['warehouse_code'],
-                            sample['qr_content'],
-                            sample['qr_format'],
-                            sample['user_id']
-                        )
-                        
-                        if 'mysql' in db_name.lower():
-                            cursor.execute(mysql_insert_sql, values)
-                        else:
-                            cursor.execute(insert_sql, values)
+                    rows = [tuple(sample[column] for column in SAMPLE_COLUMNS) for sample in sample_data]
+                    # One executemany per database instead of one execute per sample
+                    cursor.executemany(mysql_insert_sql if 'mysql' in db_name.lower() else insert_sql, rows)
                     
                     conn.commit()
                     cursor.close()
                     logger.info(f"✅ Added sample QR code data to {db_name}")
                     
                 except Exception as e:
+                    # Samples go in as one transaction per database: all or none
+                    conn.rollback()
                     logger.error(f"❌ Failed to add sample data to {db_name}: {e}")
                     
     except Exception as e:
@@ -175,19 +169,32 @@ def main():
     print("🚀 Starting QR Code Labels Migration")
     print("=" * 50)
     
-    # Create the table
-    if create_qr_code_labels_table():
-        print("✅ QR Code Labels table created successfully")
-        
-        # Add sample data
-        print("\n📝 Adding sample QR code data...")
-        add_sample_qr_codes()
-        
-        print("\n🎯 QR Code migration completed successfully!")
-    else:
+    # Both steps share one set of connections instead of reconnecting
+    try:
+        connections = get_database_connections()
+    except Exception as e:
+        logger.error(f"❌ Error getting database connections: {e}")
         print("❌ Failed to create QR Code Labels table")
         return False
     
+    try:
+        # Create the table
+        if create_qr_code_labels_table(connections):
+            print("✅ QR Code Labels table created successfully")
+            
+            # Add sample data
+            print("\n📝 Adding sample QR code data...")
+            add_sample_qr_codes(connections)
+            
+            print("\n🎯 QR Code migration completed successfully!")
+        else:
+            print("❌ Failed to create QR Code Labels table")
+            return False
+    finally:
+        for conn in connections.values():
+            if conn:
+                conn.close()
+    
     return True
 
 if __name__ == "__main__":
@@ -30,7 +30,7 @@ def reset_admin_password():
         cursor = connection.cursor()
         
         # Generate proper password hash
-        password_hash = generate_password_hash('admin123')
+        password_hash = generate_password_hash('admin123', method='scrypt')
         print(f"Generated password hash: {password_hash[:50]}...")
         
         # Update admin user password
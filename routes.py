@@ -1,6 +1,7 @@
 from flask import render_template, request, redirect, url_for, flash, jsonify, session
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import load_only
 from datetime import datetime
 import logging
 import json
@@ -397,13 +398,20 @@ def grpo():
         flash('Access denied. You do not have permission to access GRPO screen.', 'error')
         return redirect(url_for('dashboard'))
     
+    page = request.args.get('page', 1, type=int)
     try:
-        documents = GRPODocument.query.filter_by(user_id=current_user.id).order_by(GRPODocument.created_at.desc()).all()
+        # Only the columns the list shows
+        pagination = GRPODocument.query.filter_by(user_id=current_user.id).options(
+            load_only(GRPODocument.id, GRPODocument.po_number, GRPODocument.status,
+                      GRPODocument.sap_document_number, GRPODocument.created_at)
+        ).order_by(GRPODocument.created_at.desc()).paginate(page=page, per_page=25, error_out=False)
+        documents = pagination.items
     except Exception as e:
         logging.error(f"Database error in grpo: {e}")
+        pagination = None
         documents = []
         flash('Database needs to be updated. Please run: python migrate_database.py', 'warning')
-    return render_template('grpo.html', documents=documents)
+    return render_template('grpo.html', documents=documents, pagination=pagination)
 
 @app.route('/grpo/create', methods=['POST'])
 @login_required
@@ -1913,7 +1921,7 @@ def create_user():
     user = User(
         username=username,
         email=email,
-        password_hash=generate_password_hash(password),
+        password_hash=generate_password_hash(password, method='scrypt'),
         first_name=first_name,
         last_name=last_name,
         role=role,
@@ -1979,7 +1987,7 @@ def reset_password(user_id):
     user = User.query.get_or_404(user_id)
     new_password = request.form['new_password']
     
-    user.password_hash = generate_password_hash(new_password)
+    user.password_hash = generate_password_hash(new_password, method='scrypt')
     user.must_change_password = True  # Force user to change password on next login
     user.updated_at = datetime.utcnow()
     
@@ -2008,7 +2016,7 @@ def change_password():
             flash('Password must be at least 6 characters long.', 'error')
             return render_template('change_password.html')
         
-        current_user.password_hash = generate_password_hash(new_password)
+        current_user.password_hash = generate_password_hash(new_password, method='scrypt')
         current_user.must_change_password = False
         current_user.updated_at = datetime.utcnow()
         
@@ -1,24 +1,59 @@
+import functools
 import requests
 import json
 import logging
+import threading
+import time
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from app import app
 import urllib.parse
 import urllib3
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# SAP B1 Service Layer sessions time out after 30 minutes of inactivity unless
+# the login response says otherwise; renew a little before that
+SAP_SESSION_TIMEOUT_MINUTES = 30
+SAP_SESSION_MARGIN = 30
+
+
+@functools.lru_cache(maxsize=None)
+def sap_config():
+    """SAP B1 (server, username, password, company_db), read from app.config once"""
+    return (app.config['SAP_B1_SERVER'],
+            app.config['SAP_B1_USERNAME'],
+            app.config['SAP_B1_PASSWORD'],
+            app.config['SAP_B1_COMPANY_DB'])
+
 
 class SAPIntegration:
 
     def __init__(self):
-        self.base_url = app.config['SAP_B1_SERVER']
-        self.username = app.config['SAP_B1_USERNAME']
-        self.password = app.config['SAP_B1_PASSWORD']
-        self.company_db = app.config['SAP_B1_COMPANY_DB']
+        self.base_url, self.username, self.password, self.company_db = sap_config()
+        # Service Layer endpoints used on hot request paths, built once
+        self.warehouses_url = f"{self.base_url}/b1s/v1/Warehouses"
+        self.bin_locations_url = f"{self.base_url}/b1s/v1/BinLocations"
+        self.batch_details_url = f"{self.base_url}/b1s/v1/BatchNumberDetails"
         self.session_id = None
+        self._session_expires_at = 0.0
+        self._login_lock = threading.Lock()
+        # Prepared GETs carry the session cookie, so they are dropped on relogin
+        self._prepared = {}
+        self._prepared_session = None
+        self._prepared_lock = threading.Lock()
         self.session = requests.Session()
         self.session.verify = False  # For development, in production use proper SSL
+        # Pool connections so TCP/TLS handshakes are reused across requests
+        adapter = HTTPAdapter(pool_connections=32,
+                              pool_maxsize=64,
+                              max_retries=Retry(total=2,
+                                                connect=2,
+                                                backoff_factor=0.2,
+                                                allowed_methods=['GET']))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.is_offline = False
 
         # Cache for frequently accessed data
@@ -48,7 +83,10 @@ class SAPIntegration:
                                          json=login_data,
                                          timeout=10)
             if response.status_code == 200:
-                self.session_id = response.json().get('SessionId')
+                data = response.json()
+                self.session_id = data.get('SessionId')
+                timeout_minutes = data.get('SessionTimeout') or SAP_SESSION_TIMEOUT_MINUTES
+                self._session_expires_at = time.monotonic() + timeout_minutes * 60 - SAP_SESSION_MARGIN
                 logging.info("Successfully logged in to SAP B1")
                 return True
             else:
@@ -63,9 +101,32 @@ class SAPIntegration:
 
     def ensure_logged_in(self):
         """Ensure we have a valid session"""
-        if not self.session_id:
+        # Warm path: a single clock comparison, no network call
+        if self.session_id and time.monotonic() < self._session_expires_at:
+            return True
+        with self._login_lock:
+            # Another thread sharing this client may have logged in meanwhile
+            if self.session_id and time.monotonic() < self._session_expires_at:
+                return True
             return self.login()
-        return True
+
+    def get_prepared(self, url, params=None, headers=None, timeout=10, stream=False):
+        """GET url, reusing the PreparedRequest built for the same params in this session"""
+        key = (url,
+               tuple(sorted(params.items())) if params else (),
+               tuple(sorted(headers.items())) if headers else ())
+        with self._prepared_lock:
+            if self._prepared_session != self.session_id:
+                self._prepared.clear()
+                self._prepared_session = self.session_id
+            prepared = self._prepared.get(key)
+            if prepared is None:
+                if len(self._prepared) >= 1024:
+                    self._prepared.clear()
+                prepared = self.session.prepare_request(
+                    requests.Request('GET', url, params=params, headers=headers))
+                self._prepared[key] = prepared
+        return self.session.send(prepared.copy(), timeout=timeout, stream=stream)
 
     def get_inventory_transfer_request(self, doc_num):
         """Get specific inventory transfer request from SAP B1"""
@@ -716,10 +777,8 @@ class SAPIntegration:
     def get_batch_number_details(self, item_code):
         """Get batch number details for a specific item using SAP B1 API - exact endpoint from user"""
         try:
-            if not self.session_id:
-                login_result = self.login()
-                if not login_result:
-                    return {'success': False, 'error': 'SAP B1 login failed'}
+            if not self.ensure_logged_in():
+                return {'success': False, 'error': 'SAP B1 login failed'}
             
             # Use the exact API endpoint you provided
             url = f"{self.base_url}/BatchNumberDetails"
@@ -1802,6 +1861,54 @@ class SAPIntegration:
             logging.error(error_msg)
             return {'success': False, 'error': error_msg}
 
+    def find_delivery_note_for_po(self, po_number, since):
+        """Look up a Purchase Delivery Note created from a PO on or after since.
+
+        Used before re-posting a GRPO whose earlier posting may have reached
+        SAP B1 without being recorded locally. Returns {'success': True,
+        'document_number': DocNum or None}, or success False if SAP B1 could
+        not be asked.
+        """
+        if not self.ensure_logged_in():
+            return {'success': False, 'error': 'SAP B1 not available'}
+        if not str(po_number).isdigit():
+            return {'success': True, 'document_number': None}
+
+        try:
+            response = self.session.get(
+                f"{self.base_url}/b1s/v1/PurchaseOrders",
+                params={'$filter': f"DocNum eq {po_number}", '$select': 'DocEntry'},
+                timeout=10)
+            if response.status_code != 200:
+                return {'success': False, 'error': f'SAP B1 returned {response.status_code} for PO {po_number}'}
+            orders = response.json().get('value', [])
+            if not orders:
+                return {'success': True, 'document_number': None}
+            po_doc_entry = orders[0].get('DocEntry')
+
+            url = notes_url = f"{self.base_url}/b1s/v1/PurchaseDeliveryNotes"
+            params = {
+                '$select': 'DocNum,DocumentLines',
+                '$filter': f"CreationDate ge '{since.strftime('%Y-%m-%d')}' and Cancelled eq 'tNO'"
+            }
+            while url:
+                response = self.session.get(url, params=params, timeout=15)
+                if response.status_code != 200:
+                    return {'success': False, 'error': f'SAP B1 returned {response.status_code} for delivery notes'}
+                data = response.json()
+                for note in data.get('value', []):
+                    # 22 = Purchase Order as the base document of a line
+                    if any(line.get('BaseType') == 22 and line.get('BaseEntry') == po_doc_entry
+                           for line in note.get('DocumentLines', [])):
+                        return {'success': True, 'document_number': note.get('DocNum')}
+                link = data.get('odata.nextLink') or data.get('@odata.nextLink')
+                url = urllib.parse.urljoin(notes_url, link) if link else None
+                params = None
+            return {'success': True, 'document_number': None}
+        except Exception as e:
+            logging.error(f"Error looking up delivery notes for PO {po_number}: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
     def post_grpo_to_sap(self, grpo_document):
         """Post approved GRPO to SAP B1 as Purchase Delivery Note"""
         if not self.ensure_logged_in():
@@ -1865,6 +1972,7 @@ class SAPIntegration:
                 logout_url = f"{self.base_url}/b1s/v1/Logout"
                 self.session.post(logout_url)
                 self.session_id = None
+                self._session_expires_at = 0.0
                 logging.info("Logged out from SAP B1")
             except Exception as e:
                 logging.error(f"Error logging out from SAP B1: {str(e)}")